@@ -10,14 +10,30 @@ Output:
 - models/tree_###.xml: TAPAAL XML files for each tree
 - queries/tree_###.q: CTL query files for diagnosability checking
 
+With --archive, the model and query files are written as members of a
+single trees.tar (same member paths) instead of the two directories.
+
 All random generation uses seed 42 for reproducibility.
 """
 
+import argparse
+import io
+import json
+import multiprocessing
 import os
 import sys
-from typing import List, Set
+import tarfile
+import time
+from functools import partial
+from typing import List, Optional, Set, Tuple
+import numpy as np
 from tqdm import tqdm
 
+try:
+    import orjson  # Optional: faster JSON serialization
+except ImportError:
+    orjson = None
+
 # Add lib to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'lib'))
 
@@ -31,6 +47,21 @@ def create_directories():
     os.makedirs('queries', exist_ok=True)
 
 
+def write_bytes(filename: str, data: bytes) -> None:
+    """
+    Write an already-encoded payload to a file in a single call.
+    
+    The output files are small and fully built in memory, so binary mode
+    skips the text-layer encoder and chunked flushing.
+    
+    Args:
+        filename: Path of the file to write
+        data: Encoded file contents
+    """
+    with open(filename, 'wb') as f:
+        f.write(data)
+
+
 def select_observable_nodes(tree, node_attrs) -> Set[str]:
     """
     Select observable nodes for diagnosability testing.
@@ -43,88 +74,112 @@ def select_observable_nodes(tree, node_attrs) -> Set[str]:
     Returns:
         Set of observable node IDs
     """
-    observable = set()
-    
-    for node_id in tree.nodes():
-        attrs = node_attrs.get(node_id, {})
-        is_leaf = attrs.get('is_leaf', tree.out_degree(node_id) == 0)
-        
-        # Non-leaf nodes are observable (internal system states)
-        if not is_leaf:
-            observable.add(node_id)
-    
-    return observable
+    # Non-leaf nodes are observable (internal system states); the stored
+    # is_leaf flag wins over the structural out-degree when present
+    return {
+        node_id for node_id, out_degree in tree.out_degree()
+        if not node_attrs.get(node_id, {}).get('is_leaf', out_degree == 0)
+    }
 
 
-def generate_tree_batch(start_id: int, count: int, min_nodes: int = 10, max_nodes: int = 25) -> List[dict]:
+def draw_tree_sizes(count: int, min_nodes: int = 10, max_nodes: int = 25) -> List[int]:
     """
-    Generate a batch of random attack trees.
+    Draw the node count of every tree up front from a single seeded generator.
     
     Args:
-        start_id: Starting tree ID number
-        count: Number of trees to generate
+        count: Number of trees
         min_nodes: Minimum number of nodes per tree
         max_nodes: Maximum number of nodes per tree
     
     Returns:
-        List of dictionaries containing tree metadata
+        List of node counts, one per tree in ID order
     """
-    import random
-    random.seed(42)  # Fixed seed for reproducibility
-    
-    trees_info = []
-    
-    for i in range(count):
-        tree_id = start_id + i
-        
-        # Randomly select tree size
-        num_nodes = random.randint(min_nodes, max_nodes)
-        
-        # Generate tree with unique seed for each tree
-        tree, node_attrs = generate_random_tree(num_nodes, seed=42 + tree_id)
-        
-        # Validate tree structure
-        issues = validate_tree_structure(tree, node_attrs)
-        if issues:
-            print(f"Warning: Tree {tree_id:03d} has issues: {issues}")
-            # Continue anyway for evaluation purposes
-        
-        # Get tree statistics
-        stats = get_tree_statistics(tree, node_attrs)
-        
-        # Select observable nodes (all non-leaf nodes)
-        observable_nodes = select_observable_nodes(tree, node_attrs)
-        
-        # Generate TAPAAL XML
-        xml_content = enhanced_tapaal_xml(tree, node_attrs, str(tree_id))
-        
-        # Generate CTL query for diagnosability
-        query_content = diagnosability_query(tree, observable_nodes, str(tree_id))
-        
-        # Save XML file
-        xml_filename = f"models/tree_{tree_id:03d}.xml"
-        with open(xml_filename, 'w', encoding='utf-8') as f:
-            f.write(xml_content)
-        
-        # Save query file
-        query_filename = f"queries/tree_{tree_id:03d}.q"
-        with open(query_filename, 'w', encoding='utf-8') as f:
-            f.write(query_content)
-        
-        # Store tree information
-        tree_info = {
-            'tree_id': tree_id,
-            'num_nodes': num_nodes,
-            'observable_nodes': len(observable_nodes),
-            'observable_coverage': len(observable_nodes) / num_nodes,
-            'xml_file': xml_filename,
-            'query_file': query_filename,
-            'stats': stats
-        }
-        
-        trees_info.append(tree_info)
-    
-    return trees_info
+    rng = np.random.default_rng(42)
+    return rng.integers(min_nodes, max_nodes + 1, size=count).tolist()
+
+
+def _build_one_tree(task: Tuple[int, int], archive: bool = False) -> Tuple[dict, Optional[Tuple[bytes, bytes]]]:
+    """
+    Generate, validate and serialize a single random attack tree.
+    
+    The tree size is drawn up front by draw_tree_sizes, so the result does
+    not depend on which worker builds it or in what order.
+    
+    Args:
+        task: Tuple of (tree ID number, number of nodes)
+        archive: Return the model and query contents instead of writing them
+    
+    Returns:
+        Tuple of (tree_info, contents)
+        tree_info: Dictionary containing tree metadata
+        contents: (xml_bytes, query_bytes) in archive mode, otherwise None
+    """
+    tree_id, num_nodes = task
+    
+    # Generate tree with unique seed for each tree
+    tree, node_attrs = generate_random_tree(num_nodes, seed=42 + tree_id)
+    
+    # Validate tree structure
+    issues = validate_tree_structure(tree, node_attrs)
+    if issues:
+        print(f"Warning: Tree {tree_id:03d} has issues: {issues}")
+        # Continue anyway for evaluation purposes
+    
+    # Get tree statistics
+    stats = get_tree_statistics(tree, node_attrs)
+    
+    # Select observable nodes (all non-leaf nodes)
+    observable_nodes = select_observable_nodes(tree, node_attrs)
+    
+    # Generate TAPAAL XML
+    xml_content = enhanced_tapaal_xml(tree, node_attrs, str(tree_id))
+    
+    # Generate CTL query for diagnosability
+    query_content = diagnosability_query(tree, observable_nodes, str(tree_id))
+    
+    xml_filename = f"models/tree_{tree_id:03d}.xml"
+    query_filename = f"queries/tree_{tree_id:03d}.q"
+    query_content = query_content.encode('utf-8')
+    
+    if archive:
+        contents = (xml_content, query_content)
+    else:
+        # Save XML and query files
+        write_bytes(xml_filename, xml_content)
+        write_bytes(query_filename, query_content)
+        contents = None
+    
+    # Store tree information
+    tree_info = {
+        'tree_id': tree_id,
+        'num_nodes': num_nodes,
+        'observable_nodes': len(observable_nodes),
+        'observable_coverage': len(observable_nodes) / num_nodes,
+        'xml_file': xml_filename,
+        'query_file': query_filename,
+        'stats': stats
+    }
+    
+    return tree_info, contents
+
+
+def write_archive(archive_path: str, members: List[Tuple[str, bytes]]) -> None:
+    """
+    Write generated files as members of a single uncompressed tar archive.
+    
+    Args:
+        archive_path: Path of the tar file to create
+        members: List of (member path, file contents) pairs
+    """
+    # Stamp every member with the generation time rather than the epoch
+    mtime = int(time.time())
+    with open(archive_path, 'wb', buffering=1 << 20) as raw, \
+            tarfile.open(fileobj=raw, mode='w') as tf:
+        for name, data in members:
+            member = tarfile.TarInfo(name)
+            member.size = len(data)
+            member.mtime = mtime
+            tf.addfile(member, io.BytesIO(data))
 
 
 def save_tree_metadata(trees_info: List[dict]):
@@ -134,27 +189,48 @@ def save_tree_metadata(trees_info: List[dict]):
     Args:
         trees_info: List of tree information dictionaries
     """
-    import json
+    # Collect all range statistics in a single pass
+    min_nodes = max_nodes = trees_info[0]['num_nodes']
+    min_coverage = max_coverage = trees_info[0]['observable_coverage']
+    total_nodes = 0
+    total_coverage = 0.0
+    
+    for t in trees_info:
+        num_nodes = t['num_nodes']
+        coverage = t['observable_coverage']
+        if num_nodes < min_nodes:
+            min_nodes = num_nodes
+        elif num_nodes > max_nodes:
+            max_nodes = num_nodes
+        if coverage < min_coverage:
+            min_coverage = coverage
+        elif coverage > max_coverage:
+            max_coverage = coverage
+        total_nodes += num_nodes
+        total_coverage += coverage
     
     # Create summary statistics
     summary = {
         'total_trees': len(trees_info),
         'node_count_range': {
-            'min': min(t['num_nodes'] for t in trees_info),
-            'max': max(t['num_nodes'] for t in trees_info),
-            'avg': sum(t['num_nodes'] for t in trees_info) / len(trees_info)
+            'min': min_nodes,
+            'max': max_nodes,
+            'avg': total_nodes / len(trees_info)
         },
         'observable_coverage': {
-            'min': min(t['observable_coverage'] for t in trees_info),
-            'max': max(t['observable_coverage'] for t in trees_info),
-            'avg': sum(t['observable_coverage'] for t in trees_info) / len(trees_info)
+            'min': min_coverage,
+            'max': max_coverage,
+            'avg': total_coverage / len(trees_info)
         },
         'trees': trees_info
     }
     
     # Save to JSON file
-    with open('tree_metadata.json', 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2)
+    if orjson is not None:
+        metadata = orjson.dumps(summary, option=orjson.OPT_INDENT_2)
+    else:
+        metadata = json.dumps(summary, indent=2).encode('utf-8')
+    write_bytes('tree_metadata.json', metadata)
     
     print(f"Tree metadata saved to tree_metadata.json")
     print(f"Generated {len(trees_info)} trees with {summary['node_count_range']['min']}-{summary['node_count_range']['max']} nodes each")
@@ -163,34 +239,54 @@ def save_tree_metadata(trees_info: List[dict]):
 
 def main():
     """Main function to generate all attack trees."""
+    parser = argparse.ArgumentParser(description="Generate random timed attack trees for TAPAAL evaluation")
+    parser.add_argument('--archive', action='store_true',
+                        help="write models and queries into trees.tar instead of models/ and queries/")
+    args = parser.parse_args()
+    
     print("Generating 100 random timed attack trees for diagnosability evaluation...")
     print("Using fixed seed 42 for reproducibility")
     
     # Create output directories
-    create_directories()
+    if not args.archive:
+        create_directories()
+    
+    # Generate 100 trees with IDs 001-100, one independent task per tree
+    results = []
+    build = partial(_build_one_tree, archive=args.archive)
+    tasks = zip(range(1, 101), draw_tree_sizes(100))
     
-    # Generate 100 trees with IDs 001-100
-    trees_info = []
+    # Small chunks amortize IPC while still letting the pool balance load
+    with multiprocessing.Pool() as pool, tqdm(total=100, desc="Generating trees") as pbar:
+        for result in pool.imap_unordered(build, tasks, chunksize=4):
+            results.append(result)
+            pbar.update(1)
     
-    # Generate trees in batches with progress bar
-    batch_size = 10
-    num_batches = 100 // batch_size
+    # Workers finish out of order
+    results.sort(key=lambda r: r[0]['tree_id'])
+    trees_info = [tree_info for tree_info, _ in results]
     
-    with tqdm(total=100, desc="Generating trees") as pbar:
-        for batch_idx in range(num_batches):
-            start_id = batch_idx * batch_size + 1
-            batch_info = generate_tree_batch(start_id, batch_size)
-            trees_info.extend(batch_info)
-            pbar.update(batch_size)
+    if args.archive:
+        members = []
+        for tree_info, (xml_content, query_content) in results:
+            members.append((tree_info['xml_file'], xml_content))
+            members.append((tree_info['query_file'], query_content))
+        write_archive('trees.tar', members)
     
     # Save metadata about all generated trees
     save_tree_metadata(trees_info)
     
     print(f"\nSuccessfully generated:")
-    print(f"- 100 TAPAAL XML files in models/ directory")
-    print(f"- 100 CTL query files in queries/ directory")
+    if args.archive:
+        print(f"- 100 TAPAAL XML files and 100 CTL query files in trees.tar")
+    else:
+        print(f"- 100 TAPAAL XML files in models/ directory")
+        print(f"- 100 CTL query files in queries/ directory")
     print(f"- Tree metadata in tree_metadata.json")
-    print(f"\nNext step: Run './run_tapaal.sh' to execute TAPAAL verification")
+    if args.archive:
+        print(f"\nNext step: Run 'tar -xf trees.tar' and then './run_tapaal.sh' to execute TAPAAL verification")
+    else:
+        print(f"\nNext step: Run './run_tapaal.sh' to execute TAPAAL verification")
 
 
 if __name__ == "__main__":
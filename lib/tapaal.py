@@ -1,284 +1,266 @@
-"""
-TAPAAL XML generation and CTL query creation for Attack Tree diagnosability analysis.
-
-This module provides functions to convert Attack Trees with time constraints
-into TAPAAL Timed-Arc Petri Net XML format and generate corresponding
-CTL queries for diagnosability checking.
-"""
-
-import xml.etree.ElementTree as ET
-from typing import Dict, List, Tuple, Set
-import networkx as nx
-
-
-def tapaal_xml(tree: nx.DiGraph, node_attrs: Dict, tree_id: str) -> str:
-    """
-    Convert an Attack Tree to TAPAAL Timed-Arc Petri Net XML format.
-    
-    Args:
-        tree: NetworkX DiGraph representing the attack tree
-        node_attrs: Dictionary mapping node IDs to their attributes
-                   (time_interval, duration, cost, gate_type)
-        tree_id: Unique identifier for this tree
-    
-    Returns:
-        XML string in TAPAAL format
-    """
-    # Create root XML element
-    root = ET.Element("pnml", xmlns="http://www.pnml.org/version-2009/grammar/pnml")
-    
-    # Create net element
-    net = ET.SubElement(root, "net", id=f"tree_{tree_id}", type="http://www.tapaal.net/")
-    
-    # Add name
-    name = ET.SubElement(net, "name")
-    text = ET.SubElement(name, "text")
-    text.text = f"Attack Tree {tree_id}"
-    
-    # Create page element (TAPAAL uses pages)
-    page = ET.SubElement(net, "page", id="Page0")
-    
-    # Track place and transition positions for visualization
-    x_pos = 0
-    y_pos = 0
-    place_positions = {}
-    transition_positions = {}
-    
-    # Create places for each node (representing node states)
-    for node_id in tree.nodes():
-        # Compromised state place
-        place_id = f"compromised_{node_id}"
-        place = ET.SubElement(page, "place", id=place_id)
-        
-        # Position
-        place_positions[place_id] = (x_pos, y_pos)
-        graphics = ET.SubElement(place, "graphics")
-        position = ET.SubElement(graphics, "position", x=str(x_pos), y=str(y_pos))
-        
-        # Name
-        name_elem = ET.SubElement(place, "name")
-        text_elem = ET.SubElement(name_elem, "text")
-        text_elem.text = f"comp_{node_id}"
-        
-        # Initial marking (empty for all nodes initially)
-        initial_marking = ET.SubElement(place, "initialMarking")
-        text_elem = ET.SubElement(initial_marking, "text")
-        text_elem.text = "0"
-        
-        # Type (integer for counting)
-        type_elem = ET.SubElement(place, "type")
-        text_elem = ET.SubElement(type_elem, "text")
-        text_elem.text = "int"
-        
-        x_pos += 150
-        if x_pos > 600:  # Wrap to next row
-            x_pos = 0
-            y_pos += 100
-    
-    # Create transitions for attack actions
-    transition_id_counter = 0
-    
-    for node_id in tree.nodes():
-        attrs = node_attrs.get(node_id, {})
-        time_interval = attrs.get('time_interval', [0, 10])
-        duration = attrs.get('duration', 1)
-        gate_type = attrs.get('gate_type', None)
-        
-        # Create attack transition for this node
-        transition_id = f"attack_{node_id}"
-        transition = ET.SubElement(page, "transition", id=transition_id)
-        
-        # Position
-        trans_x = place_positions.get(f"compromised_{node_id}", (0, 0))[0]
-        trans_y = place_positions.get(f"compromised_{node_id}", (0, 0))[1] + 50
-        transition_positions[transition_id] = (trans_x, trans_y)
-        
-        graphics = ET.SubElement(transition, "graphics")
-        position = ET.SubElement(graphics, "position", x=str(trans_x), y=str(trans_y))
-        
-        # Name
-        name_elem = ET.SubElement(transition, "name")
-        text_elem = ET.SubElement(name_elem, "text")
-        text_elem.text = f"attack_{node_id}"
-        
-        # Time guard (earliest and latest firing times)
-        time_guard = ET.SubElement(transition, "timeguard")
-        interval = ET.SubElement(time_guard, "interval")
-        interval.set("start", str(time_interval[0]))
-        interval.set("end", str(time_interval[0] + duration))
-        
-        transition_id_counter += 1
-    
-    # Create arcs based on tree structure and gate types
-    for node_id in tree.nodes():
-        children = list(tree.successors(node_id))
-        if not children:  # Leaf node
-            continue
-            
-        attrs = node_attrs.get(node_id, {})
-        gate_type = attrs.get('gate_type', 'OR')
-        
-        # Create arcs from children to parent based on gate type
-        if gate_type == 'AND':
-            # AND gate: all children must be compromised
-            for child_id in children:
-                # Arc from child's compromised place to parent's attack transition
-                arc = ET.SubElement(page, "arc")
-                arc.set("id", f"arc_{child_id}_to_{node_id}")
-                arc.set("source", f"compromised_{child_id}")
-                arc.set("target", f"attack_{node_id}")
-                
-                # Arc weight (how many tokens needed)
-                inscription = ET.SubElement(arc, "inscription")
-                text_elem = ET.SubElement(inscription, "text")
-                text_elem.text = "1"
-        
-        elif gate_type == 'OR':
-            # OR gate: any child can trigger parent
-            for child_id in children:
-                # Arc from child's compromised place to parent's attack transition
-                arc = ET.SubElement(page, "arc")
-                arc.set("id", f"arc_{child_id}_to_{node_id}")
-                arc.set("source", f"compromised_{child_id}")
-                arc.set("target", f"attack_{node_id}")
-                
-                # Arc weight
-                inscription = ET.SubElement(arc, "inscription")
-                text_elem = ET.SubElement(inscription, "text")
-                text_elem.text = "1"
-        
-        # Arc from parent's attack transition to parent's compromised place
-        arc = ET.SubElement(page, "arc")
-        arc.set("id", f"arc_{node_id}_compromise")
-        arc.set("source", f"attack_{node_id}")
-        arc.set("target", f"compromised_{node_id}")
-        
-        inscription = ET.SubElement(arc, "inscription")
-        text_elem = ET.SubElement(inscription, "text")
-        text_elem.text = "1"
-    
-    # Convert to string
-    ET.indent(root, space="  ", level=0)
-    return ET.tostring(root, encoding='unicode', xml_declaration=True)
-
-
-def diagnosability_query(tree: nx.DiGraph, observable_nodes: Set[str], tree_id: str) -> str:
-    """
-    Generate CTL query for checking weak diagnosability of an attack tree.
-    
-    The query checks if observing the compromise of nodes in observable_nodes
-    allows unique identification of the attack path.
-    
-    Args:
-        tree: NetworkX DiGraph representing the attack tree
-        observable_nodes: Set of node IDs that are observable
-        tree_id: Unique identifier for this tree
-    
-    Returns:
-        CTL query string for TAPAAL
-    """
-    # Find root node (node with no predecessors)
-    root_nodes = [n for n in tree.nodes() if tree.in_degree(n) == 0]
-    if not root_nodes:
-        # Find node with highest out-degree as fallback
-        root_nodes = [max(tree.nodes(), key=lambda n: tree.out_degree(n))]
-    
-    root_node = root_nodes[0]
-    
-    # Create CTL formula for diagnosability
-    # The basic idea: if we can reach a state where observable nodes are compromised,
-    # then we should be able to uniquely determine the attack path
-    
-    # Generate observable conditions
-    observable_conditions = []
-    for obs_node in observable_nodes:
-        observable_conditions.append(f"compromised_{obs_node} >= 1")
-    
-    if not observable_conditions:
-        # If no observable nodes, check if root is reachable
-        query = f"EF (compromised_{root_node} >= 1)"
-    else:
-        # Check if observable pattern leads to unique state
-        obs_formula = " and ".join(observable_conditions)
-        
-        # Weak diagnosability: there exists a path where observables are compromised
-        # and this leads to a unique attack scenario
-        query = f"EF ({obs_formula} and compromised_{root_node} >= 1)"
-    
-    return f"// Diagnosability query for tree {tree_id}\n{query}\n"
-
-
-def create_leaf_attack_places(page: ET.Element, leaf_nodes: List[str]) -> None:
-    """
-    Create additional places and transitions for leaf node attacks.
-    
-    Args:
-        page: XML page element to add places to
-        leaf_nodes: List of leaf node IDs
-    """
-    y_offset = 200
-    
-    for i, leaf_id in enumerate(leaf_nodes):
-        # Create initial attack place for leaf
-        place_id = f"can_attack_{leaf_id}"
-        place = ET.SubElement(page, "place", id=place_id)
-        
-        # Position
-        graphics = ET.SubElement(place, "graphics")
-        position = ET.SubElement(graphics, "position", x=str(i * 150), y=str(y_offset))
-        
-        # Name
-        name_elem = ET.SubElement(place, "name")
-        text_elem = ET.SubElement(name_elem, "text")
-        text_elem.text = f"can_attack_{leaf_id}"
-        
-        # Initial marking (1 token - attack is possible)
-        initial_marking = ET.SubElement(place, "initialMarking")
-        text_elem = ET.SubElement(initial_marking, "text")
-        text_elem.text = "1"
-        
-        # Type
-        type_elem = ET.SubElement(place, "type")
-        text_elem = ET.SubElement(type_elem, "text")
-        text_elem.text = "int"
-        
-        # Create arc from can_attack to attack transition
-        arc = ET.SubElement(page, "arc")
-        arc.set("id", f"arc_can_attack_{leaf_id}")
-        arc.set("source", place_id)
-        arc.set("target", f"attack_{leaf_id}")
-        
-        inscription = ET.SubElement(arc, "inscription")
-        text_elem = ET.SubElement(inscription, "text")
-        text_elem.text = "1"
-
-
-def enhanced_tapaal_xml(tree: nx.DiGraph, node_attrs: Dict, tree_id: str) -> str:
-    """
-    Enhanced TAPAAL XML generation with proper timed semantics for attack trees.
-    
-    Args:
-        tree: NetworkX DiGraph representing the attack tree
-        node_attrs: Dictionary mapping node IDs to their attributes
-        tree_id: Unique identifier for this tree
-    
-    Returns:
-        Enhanced XML string in TAPAAL format
-    """
-    # Create basic structure
-    xml_content = tapaal_xml(tree, node_attrs, tree_id)
-    
-    # Parse back to add enhancements
-    root = ET.fromstring(xml_content)
-    net = root.find('.//{http://www.pnml.org/version-2009/grammar/pnml}net')
-    page = net.find('.//{http://www.pnml.org/version-2009/grammar/pnml}page')
-    
-    # Find leaf nodes
-    leaf_nodes = [n for n in tree.nodes() if tree.out_degree(n) == 0]
-    
-    # Add leaf attack initialization
-    create_leaf_attack_places(page, leaf_nodes)
-    
-    # Convert back to string
-    ET.indent(root, space="  ", level=0)
-    return ET.tostring(root, encoding='unicode', xml_declaration=True)
+"""
+TAPAAL XML generation and CTL query creation for Attack Tree diagnosability analysis.
+
+This module provides functions to convert Attack Trees with time constraints
+into TAPAAL Timed-Arc Petri Net XML format and generate corresponding
+CTL queries for diagnosability checking.
+"""
+
+from xml.sax.saxutils import escape
+from typing import Dict, List, Tuple, Set
+import networkx as nx
+
+
+_PNML_NS = "http://www.pnml.org/version-2009/grammar/pnml"
+_ATTR_ENTITIES = {'"': "&quot;"}
+
+# Fixed skeletons of the emitted elements; only the placeholders vary
+_NET_OPEN_TMPL = (
+    '<?xml version="1.0" encoding="utf-8"?>\n'
+    '<pnml xmlns="{ns}">\n'
+    '  <net id="tree_{tree_id}" type="http://www.tapaal.net/">\n'
+    '    <name><text>Attack Tree {tree_id}</text></name>\n'
+    '    <page id="Page0">\n'
+)
+_NET_CLOSE = b"    </page>\n  </net>\n</pnml>\n"
+
+_PLACE_TMPL = (
+    '      <place id="{id}">'
+    '<graphics><position x="{x}" y="{y}"/></graphics>'
+    '<name><text>{name}</text></name>'
+    '<initialMarking><text>{marking}</text></initialMarking>'
+    '<type><text>int</text></type>'
+    '</place>\n'
+)
+_TRANSITION_TMPL = (
+    '      <transition id="{id}">'
+    '<graphics><position x="{x}" y="{y}"/></graphics>'
+    '<name><text>{id}</text></name>'
+    '<timeguard><interval start="{start}" end="{end}"/></timeguard>'
+    '</transition>\n'
+)
+# Places are laid out in rows of _GRID_COLUMNS, 150 apart horizontally and
+# 100 apart vertically, with each transition 50 below its place. Coordinate
+# strings for the first _GRID_ROWS rows are built once; larger trees fall
+# back to formatting on the fly.
+_GRID_COLUMNS = 5
+_GRID_ROWS = 8
+_GRID_X = tuple(str(col * 150) for col in range(_GRID_COLUMNS))
+_PLACE_Y = tuple(str(row * 100) for row in range(_GRID_ROWS))
+_TRANSITION_Y = tuple(str(row * 100 + 50) for row in range(_GRID_ROWS))
+_LEAF_X = tuple(str(i * 150) for i in range(_GRID_COLUMNS * _GRID_ROWS))
+
+_ARC_TMPL = (
+    '      <arc id="{id}" source="{source}" target="{target}">'
+    '<inscription><text>1</text></inscription></arc>\n'
+)
+
+
+def _xml_escape(value) -> str:
+    """Escape a value for use as XML text or a double-quoted attribute."""
+    return escape(str(value), _ATTR_ENTITIES)
+
+
+def _emit_net_open(buf: bytearray, tree_id: str) -> None:
+    """
+    Append the XML declaration and the opening pnml/net/page elements.
+    
+    Args:
+        buf: Output buffer
+        tree_id: Unique identifier for this tree
+    """
+    buf += _NET_OPEN_TMPL.format_map({'ns': _PNML_NS, 'tree_id': _xml_escape(tree_id)}).encode('utf-8')
+
+
+def _successor_lists(tree: nx.DiGraph) -> Dict[str, List[str]]:
+    """Snapshot each node's children once, in tree.nodes() order."""
+    return {node_id: list(children) for node_id, children in tree.adj.items()}
+
+
+def _emit_places_transitions_arcs(buf: bytearray, succ: Dict[str, List[str]], node_attrs: Dict) -> None:
+    """
+    Append the compromise places, attack transitions and gate arcs of a tree.
+    
+    Args:
+        buf: Output buffer
+        succ: Mapping of node IDs to their children, as from _successor_lists
+        node_attrs: Dictionary mapping node IDs to their attributes
+    """
+    # Place and transition IDs are referenced several times per node
+    comp_id = {n: _xml_escape(f"compromised_{n}") for n in succ}
+    att_id = {n: _xml_escape(f"attack_{n}") for n in succ}
+    
+    # Create a place (node state) and an attack transition for each node,
+    # laid out on a grid for visualization
+    for i, node_id in enumerate(succ):
+        row, col = divmod(i, _GRID_COLUMNS)
+        x_pos = _GRID_X[col]
+        if row < _GRID_ROWS:
+            place_y = _PLACE_Y[row]
+            transition_y = _TRANSITION_Y[row]
+        else:
+            place_y = row * 100
+            transition_y = place_y + 50
+        
+        attrs = node_attrs.get(node_id, {})
+        time_interval = attrs.get('time_interval', [0, 10])
+        duration = attrs.get('duration', 1)
+        
+        # Compromised state place, empty initially, integer type for counting
+        buf += _PLACE_TMPL.format_map({
+            'id': comp_id[node_id], 'x': x_pos, 'y': place_y,
+            'name': _xml_escape(f"comp_{node_id}"), 'marking': 0,
+        }).encode('utf-8')
+        
+        # Attack transition below the place, with its time guard
+        # (earliest and latest firing times)
+        buf += _TRANSITION_TMPL.format_map({
+            'id': att_id[node_id], 'x': x_pos, 'y': transition_y,
+            'start': time_interval[0], 'end': time_interval[0] + duration,
+        }).encode('utf-8')
+    
+    # Create arcs based on tree structure and gate types
+    for node_id, children in succ.items():
+        if not children:  # Leaf node
+            continue
+        
+        attrs = node_attrs.get(node_id, {})
+        gate_type = attrs.get('gate_type', 'OR')
+        
+        # AND gate: all children must be compromised; OR gate: any child can
+        # trigger parent. Both connect each child's compromised place to the
+        # parent's attack transition.
+        if gate_type in ('AND', 'OR'):
+            for child_id in children:
+                buf += _ARC_TMPL.format_map({
+                    'id': _xml_escape(f"arc_{child_id}_to_{node_id}"),
+                    'source': comp_id[child_id],
+                    'target': att_id[node_id],
+                }).encode('utf-8')
+        
+        # Arc from parent's attack transition to parent's compromised place
+        buf += _ARC_TMPL.format_map({
+            'id': _xml_escape(f"arc_{node_id}_compromise"),
+            'source': att_id[node_id],
+            'target': comp_id[node_id],
+        }).encode('utf-8')
+
+
+def tapaal_xml(tree: nx.DiGraph, node_attrs: Dict, tree_id: str) -> bytes:
+    """
+    Convert an Attack Tree to TAPAAL Timed-Arc Petri Net XML format.
+    
+    The document is written directly into a byte buffer rather than built as
+    an ElementTree, which avoids allocating an element object per node.
+    
+    Args:
+        tree: NetworkX DiGraph representing the attack tree
+        node_attrs: Dictionary mapping node IDs to their attributes
+                   (time_interval, duration, cost, gate_type)
+        tree_id: Unique identifier for this tree
+    
+    Returns:
+        UTF-8 encoded XML document in TAPAAL format
+    """
+    buf = bytearray()
+    _emit_net_open(buf, tree_id)
+    _emit_places_transitions_arcs(buf, _successor_lists(tree), node_attrs)
+    buf += _NET_CLOSE
+    return bytes(buf)
+
+
+def diagnosability_query(tree: nx.DiGraph, observable_nodes: Set[str], tree_id: str) -> str:
+    """
+    Generate CTL query for checking weak diagnosability of an attack tree.
+    
+    The query checks if observing the compromise of nodes in observable_nodes
+    allows unique identification of the attack path.
+    
+    Args:
+        tree: NetworkX DiGraph representing the attack tree
+        observable_nodes: Set of node IDs that are observable
+        tree_id: Unique identifier for this tree
+    
+    Returns:
+        CTL query string for TAPAAL
+    """
+    # Find root node (node with no predecessors)
+    root_node = next((n for n, d in tree.in_degree() if d == 0), None)
+    if root_node is None:
+        # Find node with highest out-degree as fallback
+        out_deg = dict(tree.out_degree())
+        root_node = max(out_deg, key=out_deg.get)
+    
+    # Create CTL formula for diagnosability
+    # The basic idea: if we can reach a state where observable nodes are compromised,
+    # then we should be able to uniquely determine the attack path
+    
+    if not observable_nodes:
+        # If no observable nodes, check if root is reachable
+        query = f"EF (compromised_{root_node} >= 1)"
+    else:
+        # Check if observable pattern leads to unique state; nodes are sorted
+        # so the query text does not depend on set iteration order
+        obs_formula = " and ".join(f"compromised_{n} >= 1" for n in sorted(observable_nodes))
+        
+        # Weak diagnosability: there exists a path where observables are compromised
+        # and this leads to a unique attack scenario
+        query = f"EF ({obs_formula} and compromised_{root_node} >= 1)"
+    
+    return f"// Diagnosability query for tree {tree_id}\n{query}\n"
+
+
+def _emit_leaf_places(buf: bytearray, leaf_nodes: List[str]) -> None:
+    """
+    Append the initial attack places and arcs for leaf nodes.
+    
+    Args:
+        buf: Output buffer
+        leaf_nodes: List of leaf node IDs
+    """
+    y_offset = 200
+    
+    for i, leaf_id in enumerate(leaf_nodes):
+        # Initial attack place for leaf (1 token - attack is possible),
+        # with an arc into the leaf's attack transition
+        place_id = _xml_escape(f"can_attack_{leaf_id}")
+        buf += _PLACE_TMPL.format_map({
+            'id': place_id, 'x': _LEAF_X[i] if i < len(_LEAF_X) else i * 150, 'y': y_offset,
+            'name': place_id, 'marking': 1,
+        }).encode('utf-8')
+        buf += _ARC_TMPL.format_map({
+            'id': _xml_escape(f"arc_can_attack_{leaf_id}"),
+            'source': place_id,
+            'target': _xml_escape(f"attack_{leaf_id}"),
+        }).encode('utf-8')
+
+
+def enhanced_tapaal_xml(tree: nx.DiGraph, node_attrs: Dict, tree_id: str) -> bytes:
+    """
+    Enhanced TAPAAL XML generation with proper timed semantics for attack trees.
+    
+    Extends the tapaal_xml net with initial attack places for the leaves,
+    written in the same pass.
+    
+    Args:
+        tree: NetworkX DiGraph representing the attack tree
+        node_attrs: Dictionary mapping node IDs to their attributes
+        tree_id: Unique identifier for this tree
+    
+    Returns:
+        UTF-8 encoded enhanced XML document in TAPAAL format
+    """
+    succ = _successor_lists(tree)
+    
+    # Find leaf nodes
+    leaf_nodes = [n for n, children in succ.items() if not children]
+    
+    buf = bytearray()
+    _emit_net_open(buf, tree_id)
+    _emit_places_transitions_arcs(buf, succ, node_attrs)
+    
+    # Add leaf attack initialization
+    _emit_leaf_places(buf, leaf_nodes)
+    
+    buf += _NET_CLOSE
+    return bytes(buf)
@@ -6,10 +6,29 @@ construct specific use-case scenarios like e-commerce platform security.
 """
 
 import networkx as nx
+import numpy as np
 import random
+import sys
+from dataclasses import dataclass
+from enum import IntEnum
+from functools import lru_cache
 from typing import Dict, List, Tuple, Any
 
 
+# Node names of the e-commerce use-case tree, interned so that comparisons
+# and path membership tests can short-circuit on identity
+CC_DB_EXFILTRATED = sys.intern("cc_db_exfiltrated")
+INTERNAL_ACCESS = sys.intern("internal_access")
+DATABASE_ACCESS = sys.intern("database_access")
+DATA_EXTRACTION = sys.intern("data_extraction")
+SPEAR_PHISH_DEV = sys.intern("spear_phish_dev")
+AUTH_SERVICE_EXPLOIT = sys.intern("auth_service_exploit")
+PRIVILEGE_ESCALATION = sys.intern("privilege_escalation")
+NETWORK_LATERAL_MOVEMENT = sys.intern("network_lateral_movement")
+STEAL_DB_CREDENTIALS = sys.intern("steal_db_credentials")
+ESTABLISH_EXFIL_CHANNEL = sys.intern("establish_exfil_channel")
+
+
 def generate_random_tree(num_nodes: int, seed: int = 42) -> Tuple[nx.DiGraph, Dict[str, Any]]:
     """
     Generate a random attack tree with time constraints.
@@ -33,68 +52,60 @@ def generate_random_tree(num_nodes: int, seed: int = 42) -> Tuple[nx.DiGraph, Di
     node_ids = [f"node_{i:02d}" for i in range(num_nodes)]
     
     # Add all nodes to graph
-    for node_id in node_ids:
-        tree.add_node(node_id)
+    tree.add_nodes_from(node_ids)
     
     # Create tree structure (ensure it's a proper tree)
     # Start with root node
     root_id = node_ids[0]
     remaining_nodes = node_ids[1:]
     
-    # Build tree by randomly attaching nodes
-    for node_id in remaining_nodes:
-        # Choose a random parent from existing nodes
-        potential_parents = [n for n in tree.nodes() if n != node_id]
-        parent_id = random.choice(potential_parents)
-        tree.add_edge(parent_id, node_id)
+    # Build tree by randomly attaching nodes; edges are sampled first and
+    # inserted into the graph in one call
+    edges = []
+    for i, node_id in enumerate(remaining_nodes, start=1):
+        # Choose a random parent among the nodes already attached, so every
+        # node has exactly one parent and the result is a rooted tree
+        parent_id = node_ids[random.randrange(i)]
+        edges.append((parent_id, node_id))
+    tree.add_edges_from(edges)
     
     # Identify leaf nodes (nodes with no children)
-    leaf_nodes = [n for n in tree.nodes() if tree.out_degree(n) == 0]
+    leaf_nodes = {n for n, d in tree.out_degree() if d == 0}
+    
+    # Draw all node attributes at once; leaves (basic attack actions) and
+    # internal nodes (intermediate goals with gates) use different ranges
+    rng = np.random.default_rng(seed + num_nodes)
+    is_leaf = np.array([node_id in leaf_nodes for node_id in node_ids])
+    
+    time_start = rng.integers(0, np.where(is_leaf, 6, 9))
+    time_end = time_start + rng.integers(np.where(is_leaf, 2, 3), np.where(is_leaf, 11, 13))
+    duration = rng.integers(1, np.where(is_leaf, 5, 4))
+    cost = rng.integers(np.where(is_leaf, 1, 0), np.where(is_leaf, 16, 9))
+    
+    # Internal nodes are AND or OR gates; SAND gates are less common (10% chance)
+    gate_types = np.where(rng.random(num_nodes) < 0.5, 'AND', 'OR')
+    gate_types = np.where(rng.random(num_nodes) < 0.1, 'SAND', gate_types)
     
     # Assign attributes to each node
-    for node_id in node_ids:
-        is_leaf = node_id in leaf_nodes
-        
-        if is_leaf:
-            # Leaf nodes: basic attack actions
-            time_start = random.randint(0, 5)
-            time_end = time_start + random.randint(2, 10)
-            duration = random.randint(1, 4)
-            cost = random.randint(1, 15)
-            gate_type = None
-        else:
-            # Non-leaf nodes: intermediate goals with gates
-            time_start = random.randint(0, 8)
-            time_end = time_start + random.randint(3, 12)
-            duration = random.randint(1, 3)
-            cost = random.randint(0, 8)
-            gate_type = random.choice(['AND', 'OR'])
-            
-            # SAND gates are less common
-            if random.random() < 0.1:  # 10% chance
-                gate_type = 'SAND'
-        
+    for node_id, leaf, start, end, dur, c, gate in zip(
+            node_ids, is_leaf.tolist(), time_start.tolist(), time_end.tolist(),
+            duration.tolist(), cost.tolist(), gate_types.tolist()):
         node_attrs[node_id] = {
-            'time_interval': [time_start, time_end],
-            'duration': duration,
-            'cost': cost,
-            'gate_type': gate_type,
-            'is_leaf': is_leaf
+            'time_interval': [start, end],
+            'duration': dur,
+            'cost': c,
+            'gate_type': None if leaf else gate,
+            'is_leaf': leaf
         }
     
-    # Ensure tree is connected and has reasonable structure
-    if not nx.is_weakly_connected(tree):
-        # Fix connectivity issues
-        components = list(nx.weakly_connected_components(tree))
-        for i in range(1, len(components)):
-            # Connect each component to the main component
-            main_node = list(components[0])[0]
-            comp_node = list(components[i])[0]
-            tree.add_edge(main_node, comp_node)
+    # Every node was attached to an earlier one, so the tree is connected
+    # by construction; the check is stripped under python -O
+    assert nx.is_weakly_connected(tree), "generated tree is not connected"
     
     return tree, node_attrs
 
 
+@lru_cache(maxsize=1)
 def ecommerce_tree() -> Tuple[nx.DiGraph, Dict[str, Any]]:
     """
     Construct a realistic e-commerce platform attack tree for insider threat scenario.
@@ -102,6 +113,9 @@ def ecommerce_tree() -> Tuple[nx.DiGraph, Dict[str, Any]]:
     Models an insider threat attempting to exfiltrate credit card database
     from a cloud-hosted e-commerce platform.
     
+    The tree is built once and cached; every call returns the same graph and
+    attribute dictionary, so callers must treat them as read-only.
+    
     Returns:
         Tuple of (tree, node_attributes)
     """
@@ -110,20 +124,20 @@ def ecommerce_tree() -> Tuple[nx.DiGraph, Dict[str, Any]]:
     
     # Define the attack tree structure
     # Root goal: Credit card DB exfiltrated
-    root = "cc_db_exfiltrated"
+    root = CC_DB_EXFILTRATED
     
     # Intermediate nodes
-    internal_access = "internal_access"
-    db_access = "database_access"
-    data_extraction = "data_extraction"
+    internal_access = INTERNAL_ACCESS
+    db_access = DATABASE_ACCESS
+    data_extraction = DATA_EXTRACTION
     
     # Leaf nodes (atomic attacks)
-    spear_phish = "spear_phish_dev"
-    auth_exploit = "auth_service_exploit"
-    privilege_esc = "privilege_escalation"
-    network_lateral = "network_lateral_movement"
-    db_creds = "steal_db_credentials"
-    exfil_channel = "establish_exfil_channel"
+    spear_phish = SPEAR_PHISH_DEV
+    auth_exploit = AUTH_SERVICE_EXPLOIT
+    privilege_esc = PRIVILEGE_ESCALATION
+    network_lateral = NETWORK_LATERAL_MOVEMENT
+    db_creds = STEAL_DB_CREDENTIALS
+    exfil_channel = ESTABLISH_EXFIL_CHANNEL
     
     # Build tree structure
     nodes = [
@@ -252,6 +266,95 @@ def ecommerce_tree() -> Tuple[nx.DiGraph, Dict[str, Any]]:
     return tree, node_attrs
 
 
+class Gate(IntEnum):
+    """Integer codes for gate types in array representations of a tree."""
+    NONE = 0
+    AND = 1
+    OR = 2
+    SAND = 3
+
+
+# Gate types valid on non-leaf nodes, as stored in node_attrs
+GATE_TYPES = ('AND', 'OR', 'SAND')
+
+_GATE_CODES = {'AND': Gate.AND, 'OR': Gate.OR, 'SAND': Gate.SAND}
+
+def _numeric_column(values: List[Any]) -> np.ndarray:
+    """Array of attribute values, with an empty column typed as int64."""
+    return np.asarray(values) if values else np.empty(0, dtype=np.int64)
+
+
+@dataclass
+class CompactTree:
+    """
+    Array-based snapshot of the node attributes of an attack tree.
+    
+    Covers the nodes that have an entry in node_attrs, in its iteration
+    order. Attributes are kept in one structured array with fields t0 and t1
+    (time_interval bounds), cost and gate. The time and cost fields are int64
+    when all their values are integers and float64 otherwise; gate types are
+    stored as int8 Gate codes, with anything else mapped to Gate.NONE.
+    """
+    nodes: List[str]
+    attrs: np.ndarray
+    
+    @classmethod
+    def from_node_attrs(cls, node_attrs: Dict[str, Any]) -> 'CompactTree':
+        """
+        Build a compact snapshot of a node attribute dictionary.
+        
+        Args:
+            node_attrs: Dictionary of node attributes
+        
+        Returns:
+            CompactTree with nodes in node_attrs order
+        """
+        nodes = list(node_attrs)
+        attr_dicts = node_attrs.values()
+        intervals = [a.get('time_interval', [0, 1]) for a in attr_dicts]
+        
+        t0 = _numeric_column([t[0] for t in intervals])
+        t1 = _numeric_column([t[1] for t in intervals])
+        cost = _numeric_column([a.get('cost', 0) for a in attr_dicts])
+        
+        # Integer columns stay integer; any non-integer value widens to float
+        time_type = np.result_type(t0, t1, np.int64)
+        cost_type = np.result_type(cost, np.int64)
+        attrs = np.empty(len(nodes), dtype=[
+            ('t0', time_type), ('t1', time_type), ('cost', cost_type), ('gate', 'i1'),
+        ])
+        attrs['t0'] = t0
+        attrs['t1'] = t1
+        attrs['cost'] = cost
+        attrs['gate'] = [_GATE_CODES.get(a.get('gate_type'), Gate.NONE) for a in attr_dicts]
+        
+        return cls(nodes=nodes, attrs=attrs)
+
+
+def _longest_path_length(tree: nx.DiGraph) -> int:
+    """
+    Length in edges of the longest path, or 0 if the graph has a cycle.
+    
+    A single topological sweep both detects cycles and carries the depth DP.
+    
+    Args:
+        tree: NetworkX DiGraph representing the attack tree
+    
+    Returns:
+        Number of edges on the longest path
+    """
+    try:
+        topo = list(nx.topological_sort(tree))
+    except nx.NetworkXUnfeasible:
+        return 0
+    
+    pred = tree.pred
+    depth = {}
+    for v in topo:
+        depth[v] = 1 + max((depth[u] for u in pred[v]), default=0)
+    return max(depth.values(), default=1) - 1
+
+
 def get_tree_statistics(tree: nx.DiGraph, node_attrs: Dict[str, Any]) -> Dict[str, Any]:
     """
     Calculate statistics for an attack tree.
@@ -263,35 +366,42 @@ def get_tree_statistics(tree: nx.DiGraph, node_attrs: Dict[str, Any]) -> Dict[st
     Returns:
         Dictionary of tree statistics
     """
-    leaf_nodes = [n for n in tree.nodes() if tree.out_degree(n) == 0]
+    compact = CompactTree.from_node_attrs(node_attrs)
+    num_nodes = tree.number_of_nodes()
+    num_leaves = sum(1 for _, d in tree.out_degree() if d == 0)
     
     # Count gate types
-    gate_counts = {'AND': 0, 'OR': 0, 'SAND': 0, 'None': 0}
-    total_cost = 0
-    time_spans = []
-    
-    for node_id, attrs in node_attrs.items():
-        gate_type = attrs.get('gate_type', 'None')
-        if gate_type in gate_counts:
-            gate_counts[gate_type] += 1
-        else:
-            gate_counts['None'] += 1
-        
-        total_cost += attrs.get('cost', 0)
-        
-        time_interval = attrs.get('time_interval', [0, 1])
-        time_spans.append(time_interval[1] - time_interval[0])
+    attrs = compact.attrs
+    counts = np.bincount(attrs['gate'], minlength=len(Gate))
+    gate_counts = {
+        'AND': int(counts[Gate.AND]),
+        'OR': int(counts[Gate.OR]),
+        'SAND': int(counts[Gate.SAND]),
+        'None': int(counts[Gate.NONE])
+    }
+    
+    # Cost and time-window reductions over the attribute arrays; item()
+    # returns Python ints for integer columns and floats otherwise
+    total_cost = attrs['cost'].sum().item()
+    time_spans = attrs['t1'] - attrs['t0']
+    
+    # Report the widest span as computed from its own node's interval, so an
+    # integer span keeps its type even when other windows are non-integer
+    max_time_span = 0
+    if time_spans.size:
+        widest = node_attrs[compact.nodes[int(time_spans.argmax())]].get('time_interval', [0, 1])
+        max_time_span = widest[1] - widest[0]
     
     return {
-        'total_nodes': len(tree.nodes()),
-        'leaf_nodes': len(leaf_nodes),
-        'internal_nodes': len(tree.nodes()) - len(leaf_nodes),
-        'total_edges': len(tree.edges()),
-        'max_depth': nx.dag_longest_path_length(tree) if nx.is_dag(tree) else 0,
+        'total_nodes': num_nodes,
+        'leaf_nodes': num_leaves,
+        'internal_nodes': num_nodes - num_leaves,
+        'total_edges': tree.number_of_edges(),
+        'max_depth': _longest_path_length(tree),
         'gate_counts': gate_counts,
         'total_cost': total_cost,
-        'avg_time_span': sum(time_spans) / len(time_spans) if time_spans else 0,
-        'max_time_span': max(time_spans) if time_spans else 0
+        'avg_time_span': float(time_spans.mean()) if time_spans.size else 0,
+        'max_time_span': max_time_span
     }
 
 
@@ -313,9 +423,11 @@ def validate_tree_structure(tree: nx.DiGraph, node_attrs: Dict[str, Any]) -> Lis
         issues.append("Tree is not connected")
     
     # Check if tree is acyclic
-    if not nx.is_dag(tree):
+    if not nx.is_directed_acyclic_graph(tree):
         issues.append("Tree contains cycles")
     
+    out_deg = dict(tree.out_degree())
+    
     # Check for nodes without attributes
     for node_id in tree.nodes():
         if node_id not in node_attrs:
@@ -337,8 +449,8 @@ def validate_tree_structure(tree: nx.DiGraph, node_attrs: Dict[str, Any]) -> Lis
                 issues.append(f"Node {node_id} has invalid time interval")
         
         # Validate gate types for non-leaf nodes
-        if tree.out_degree(node_id) > 0:  # Non-leaf node
-            if attrs.get('gate_type') not in ['AND', 'OR', 'SAND']:
+        if out_deg[node_id] > 0:  # Non-leaf node
+            if attrs.get('gate_type') not in GATE_TYPES:
                 issues.append(f"Non-leaf node {node_id} has invalid gate type")
         else:  # Leaf node
             if attrs.get('gate_type') is not None:
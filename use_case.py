@@ -16,13 +16,117 @@ import os
 import sys
 from typing import Set
 
+import networkx as nx
+
 # Add lib to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'lib'))
 
-from lib.trees import ecommerce_tree, validate_tree_structure, get_tree_statistics
+from lib.trees import (
+    ecommerce_tree, validate_tree_structure, get_tree_statistics,
+    CC_DB_EXFILTRATED, AUTH_SERVICE_EXPLOIT
+)
 from lib.tapaal import enhanced_tapaal_xml, diagnosability_query
 
 
+# Detailed description of the e-commerce attack scenario
+ATTACK_SCENARIO_DESCRIPTION = """
+E-COMMERCE PLATFORM INSIDER THREAT SCENARIO
+===========================================
+
+SCENARIO OVERVIEW:
+A malicious insider (disgruntled employee or compromised account) attempts to 
+exfiltrate customer credit card data from a cloud-hosted e-commerce platform.
+
+SYSTEM ARCHITECTURE:
+- Cloud-hosted e-commerce platform with microservices architecture
+- Credit card database with encrypted customer payment data
+- Authentication service managing user/service access
+- Network segmentation with monitoring capabilities
+
+ATTACK GOAL:
+Complete exfiltration of credit card database (root node: cc_db_exfiltrated)
+
+ATTACK TREE STRUCTURE:
+The 9-node attack tree models realistic MITRE ATT&CK techniques:
+
+1. LEAF NODES (Atomic Attacks):
+   - spear_phish_dev: Spear phishing targeting developers (T1566)
+   - auth_service_exploit: Exploitation of authentication service vulnerability (T1190)
+   - network_lateral_movement: Lateral movement through network (T1021)
+   - steal_db_credentials: Credential theft for database access (T1552)
+   - establish_exfil_channel: Setting up covert data exfiltration (T1041)
+
+2. INTERMEDIATE NODES (Attack Objectives):
+   - internal_access: Initial access to internal systems
+   - privilege_escalation: Escalating privileges for database access
+   - database_access: Gaining access to the credit card database
+   - data_extraction: Capability to extract large amounts of data
+
+3. ROOT NODE:
+   - cc_db_exfiltrated: Successful exfiltration of credit card database
+
+GATE LOGIC:
+- OR gates: Multiple paths to achieve objective (e.g., internal access via phishing OR exploit)
+- AND gates: Multiple requirements must be satisfied (e.g., database access requires BOTH internal access AND credentials)
+
+TIME CONSTRAINTS:
+- Attack window: 0-72 hours (3-day maximum operational security window)
+- Individual attack durations: 2-6 hours per technique
+- Business constraints: Some attacks more effective during business hours
+
+OBSERVATION SCENARIO:
+The defender has monitoring on the authentication service and can detect when it's compromised.
+The key research question: Can observing auth_service_exploit compromise allow unique 
+identification of the complete attack path?
+
+EXPECTED RESULT:
+Yes - observing auth_service_exploit provides sufficient information to uniquely diagnose
+the attack because it's part of a critical path that, once taken, constrains the remaining
+attack options to a single consistent sequence.
+"""
+
+
+# Enhanced diagnosability query; {obs} is the observed node, {root} the goal
+_CTL_TEMPLATE = "\n".join([
+    "// Enhanced diagnosability query for e-commerce insider threat scenario",
+    "// Proves that observing auth_service_exploit compromise allows unique attack diagnosis",
+    "",
+    "// Query 1: Check if auth service compromise can lead to root compromise",
+    "EF (compromised_{obs} >= 1 and EF compromised_{root} >= 1)",
+    "",
+    "// Query 2: Check temporal ordering - auth service must be compromised before root",
+    "AG (compromised_{root} >= 1 -> EF compromised_{obs} >= 1)",
+    "",
+    "// Query 3: Verify unique path constraint",
+    "EF (compromised_{obs} >= 1 and compromised_{root} >= 1)"
+])
+
+
+def _root_paths(parents: dict, leaf: str, root_node: str):
+    """
+    Yield every simple root-to-leaf path by walking predecessors up from a leaf.
+    
+    Args:
+        parents: Mapping of node IDs to their predecessors
+        leaf: Leaf node to start from
+        root_node: Root goal the walk must reach
+    
+    Yields:
+        Paths as lists of node IDs in root-to-leaf order
+    """
+    stack = [[leaf]]
+    while stack:
+        path = stack.pop()
+        node = path[-1]
+        if node == root_node:
+            yield path[::-1]
+            continue
+        # Push in reverse so parents are explored in insertion order
+        for parent in reversed(parents[node]):
+            if parent not in path:
+                stack.append(path + [parent])
+
+
 def analyze_attack_paths(tree, node_attrs) -> dict:
     """
     Analyze all possible attack paths in the e-commerce scenario.
@@ -34,30 +138,39 @@ def analyze_attack_paths(tree, node_attrs) -> dict:
     Returns:
         Dictionary with attack path analysis
     """
-    import networkx as nx
-    
     # Find all leaf-to-root paths
-    root_node = "cc_db_exfiltrated"
-    leaf_nodes = [n for n in tree.nodes() if tree.out_degree(n) == 0]
+    root_node = CC_DB_EXFILTRATED
+    leaf_nodes = [n for n, d in tree.out_degree() if d == 0]
+    
+    # Only nodes below the root can lie on a root-to-leaf path, so the
+    # upward walk never follows predecessors outside that set
+    reachable = nx.descendants(tree, root_node)
+    reachable.add(root_node)
+    parents = {n: [p for p in tree.pred[n] if p in reachable] for n in reachable}
     
     attack_paths = []
     
     for leaf in leaf_nodes:
-        try:
-            # Find all simple paths from leaf to root
-            paths = list(nx.all_simple_paths(tree.reverse(), leaf, root_node))
-            for path in paths:
-                path.reverse()  # Reverse to get root-to-leaf order
-                attack_paths.append({
-                    'path': path,
-                    'leaf_node': leaf,
-                    'length': len(path),
-                    'total_cost': sum(node_attrs[node]['cost'] for node in path),
-                    'total_time': max(node_attrs[node]['time_interval'][1] + 
-                                    node_attrs[node]['duration'] for node in path)
-                })
-        except nx.NetworkXNoPath:
+        if leaf not in reachable:
             continue
+        for path in _root_paths(parents, leaf, root_node):
+            # Sum costs and track the latest finishing time in one pass
+            total_cost = 0
+            total_time = 0
+            for node in path:
+                attrs = node_attrs[node]
+                total_cost += attrs['cost']
+                finish = attrs['time_interval'][1] + attrs['duration']
+                if finish > total_time:
+                    total_time = finish
+            
+            attack_paths.append({
+                'path': path,
+                'leaf_node': leaf,
+                'length': len(path),
+                'total_cost': total_cost,
+                'total_time': total_time
+            })
     
     return {
         'total_paths': len(attack_paths),
@@ -67,27 +180,45 @@ def analyze_attack_paths(tree, node_attrs) -> dict:
     }
 
 
-def demonstrate_diagnosability_with_auth_service(tree, node_attrs) -> dict:
+def demonstrate_diagnosability_with_auth_service(tree, node_attrs, path_analysis: dict = None) -> dict:
     """
     Demonstrate that observing auth_service_exploit allows unique attack diagnosis.
     
     Args:
         tree: NetworkX DiGraph representing the attack tree
         node_attrs: Dictionary of node attributes
+        path_analysis: Result of analyze_attack_paths for this tree, if
+                       already computed
     
     Returns:
         Dictionary with diagnosability analysis results
     """
-    observable_node = "auth_service_exploit"
+    observable_node = AUTH_SERVICE_EXPLOIT
     
     # Analyze which attack paths involve the auth service exploit
-    path_analysis = analyze_attack_paths(tree, node_attrs)
+    if path_analysis is None:
+        path_analysis = analyze_attack_paths(tree, node_attrs)
     
     paths_with_auth = []
     paths_without_auth = []
     
+    # In a real tree (no node has two parents) each leaf has a single root
+    # path, which passes through the observable node exactly when the leaf
+    # lies in the observable's subtree; one traversal then answers for all
+    # paths. Shared subtrees can reach the root both through and around the
+    # observable, so there the paths themselves are scanned.
+    is_tree = all(deg <= 1 for _, deg in tree.in_degree())
+    if is_tree:
+        observed_subtree = nx.descendants(tree, observable_node)
+        observed_subtree.add(observable_node)
+    
     for path_info in path_analysis['paths']:
-        if observable_node in path_info['path']:
+        if is_tree:
+            observed = path_info['leaf_node'] in observed_subtree
+        else:
+            observed = observable_node in path_info['path']
+        
+        if observed:
             paths_with_auth.append(path_info)
         else:
             paths_without_auth.append(path_info)
@@ -118,24 +249,9 @@ def generate_enhanced_ctl_query(tree, observable_node: str) -> str:
     Returns:
         Enhanced CTL query string
     """
-    root_node = "cc_db_exfiltrated"
-    
-    # Create comprehensive diagnosability query
-    query_parts = [
-        "// Enhanced diagnosability query for e-commerce insider threat scenario",
-        "// Proves that observing auth_service_exploit compromise allows unique attack diagnosis",
-        "",
-        "// Query 1: Check if auth service compromise can lead to root compromise",
-        f"EF (compromised_{observable_node} >= 1 and EF compromised_{root_node} >= 1)",
-        "",
-        "// Query 2: Check temporal ordering - auth service must be compromised before root",
-        f"AG (compromised_{root_node} >= 1 -> EF compromised_{observable_node} >= 1)",
-        "",
-        "// Query 3: Verify unique path constraint",
-        f"EF (compromised_{observable_node} >= 1 and compromised_{root_node} >= 1)"
-    ]
+    root_node = CC_DB_EXFILTRATED
     
-    return "\n".join(query_parts)
+    return _CTL_TEMPLATE.format(obs=observable_node, root=root_node)
 
 
 def create_attack_scenario_description() -> str:
@@ -145,164 +261,113 @@ def create_attack_scenario_description() -> str:
     Returns:
         Formatted description string
     """
-    description = """
-E-COMMERCE PLATFORM INSIDER THREAT SCENARIO
-===========================================
-
-SCENARIO OVERVIEW:
-A malicious insider (disgruntled employee or compromised account) attempts to 
-exfiltrate customer credit card data from a cloud-hosted e-commerce platform.
-
-SYSTEM ARCHITECTURE:
-- Cloud-hosted e-commerce platform with microservices architecture
-- Credit card database with encrypted customer payment data
-- Authentication service managing user/service access
-- Network segmentation with monitoring capabilities
-
-ATTACK GOAL:
-Complete exfiltration of credit card database (root node: cc_db_exfiltrated)
-
-ATTACK TREE STRUCTURE:
-The 9-node attack tree models realistic MITRE ATT&CK techniques:
-
-1. LEAF NODES (Atomic Attacks):
-   - spear_phish_dev: Spear phishing targeting developers (T1566)
-   - auth_service_exploit: Exploitation of authentication service vulnerability (T1190)
-   - network_lateral_movement: Lateral movement through network (T1021)
-   - steal_db_credentials: Credential theft for database access (T1552)
-   - establish_exfil_channel: Setting up covert data exfiltration (T1041)
-
-2. INTERMEDIATE NODES (Attack Objectives):
-   - internal_access: Initial access to internal systems
-   - privilege_escalation: Escalating privileges for database access
-   - database_access: Gaining access to the credit card database
-   - data_extraction: Capability to extract large amounts of data
-
-3. ROOT NODE:
-   - cc_db_exfiltrated: Successful exfiltration of credit card database
-
-GATE LOGIC:
-- OR gates: Multiple paths to achieve objective (e.g., internal access via phishing OR exploit)
-- AND gates: Multiple requirements must be satisfied (e.g., database access requires BOTH internal access AND credentials)
-
-TIME CONSTRAINTS:
-- Attack window: 0-72 hours (3-day maximum operational security window)
-- Individual attack durations: 2-6 hours per technique
-- Business constraints: Some attacks more effective during business hours
-
-OBSERVATION SCENARIO:
-The defender has monitoring on the authentication service and can detect when it's compromised.
-The key research question: Can observing auth_service_exploit compromise allow unique 
-identification of the complete attack path?
-
-EXPECTED RESULT:
-Yes - observing auth_service_exploit provides sufficient information to uniquely diagnose
-the attack because it's part of a critical path that, once taken, constrains the remaining
-attack options to a single consistent sequence.
-"""
-    
-    return description
+    return ATTACK_SCENARIO_DESCRIPTION
 
 
 def main():
     """Main function to generate e-commerce use case analysis."""
-    print("=" * 60)
-    print("E-COMMERCE PLATFORM INSIDER THREAT USE CASE")
-    print("=" * 60)
-    
-    # Generate scenario description
-    description = create_attack_scenario_description()
-    print(description)
-    
-    # Create the e-commerce attack tree
-    print("Generating e-commerce attack tree...")
-    tree, node_attrs = ecommerce_tree()
-    
-    # Validate tree structure
-    issues = validate_tree_structure(tree, node_attrs)
-    if issues:
-        print(f"Warning: Tree structure issues found: {issues}")
-    else:
-        print("✓ Tree structure validation passed")
-    
-    # Get tree statistics
-    stats = get_tree_statistics(tree, node_attrs)
-    print(f"\nTree Statistics:")
-    print(f"- Total nodes: {stats['total_nodes']}")
-    print(f"- Leaf nodes: {stats['leaf_nodes']}")
-    print(f"- Internal nodes: {stats['internal_nodes']}")
-    print(f"- Tree depth: {stats['max_depth']}")
-    print(f"- Gate distribution: {stats['gate_counts']}")
-    print(f"- Total attack cost: {stats['total_cost']}")
-    print(f"- Average time span: {stats['avg_time_span']:.1f} hours")
-    
-    # Analyze attack paths
-    print(f"\nAnalyzing attack paths...")
-    path_analysis = analyze_attack_paths(tree, node_attrs)
-    print(f"- Total possible attack paths: {path_analysis['total_paths']}")
-    print(f"- Unique leaf attack vectors: {path_analysis['unique_leaves']}")
-    
-    # Demonstrate diagnosability with auth service observation
-    print(f"\nDiagnosability Analysis:")
-    diag_analysis = demonstrate_diagnosability_with_auth_service(tree, node_attrs)
-    print(f"- Observable node: {diag_analysis['observable_node']}")
-    print(f"- Paths involving auth service: {diag_analysis['paths_with_observation']}")
-    print(f"- Paths not involving auth service: {diag_analysis['paths_without_observation']}")
-    print(f"- Unique diagnosis possible: {diag_analysis['unique_diagnosis_possible']}")
-    
-    if diag_analysis['diagnosed_path']:
-        diagnosed = diag_analysis['diagnosed_path']
-        print(f"\nDiagnosed Attack Path:")
-        print(f"- Path: {' → '.join(diagnosed['path'])}")
-        print(f"- Primary attack vector: {diagnosed['leaf_node']}")
-        print(f"- Total cost: {diagnosed['total_cost']} units")
-        print(f"- Maximum time: {diagnosed['total_time']} hours")
-    
-    # Generate TAPAAL XML model
-    print(f"\nGenerating TAPAAL model...")
-    xml_content = enhanced_tapaal_xml(tree, node_attrs, "ecommerce")
-    
-    with open('use_case.xml', 'w', encoding='utf-8') as f:
-        f.write(xml_content)
-    print("✓ TAPAAL model saved to: use_case.xml")
-    
-    # Generate enhanced CTL query
-    print(f"Generating CTL diagnosability query...")
-    observable_nodes = {"auth_service_exploit"}  # Key observation point
-    query_content = generate_enhanced_ctl_query(tree, "auth_service_exploit")
-    
-    with open('use_case.q', 'w', encoding='utf-8') as f:
-        f.write(query_content)
-    print("✓ CTL query saved to: use_case.q")
-    
-    # Generate detailed analysis for the report
-    analysis_summary = {
-        'scenario': 'E-commerce Platform Insider Threat',
-        'tree_stats': stats,
-        'path_analysis': path_analysis,
-        'diagnosability': diag_analysis,
-        'observable_strategy': 'Authentication service monitoring',
-        'key_finding': 'Auth service compromise enables unique attack path diagnosis'
-    }
-    
-    # Save analysis results for use_case_report.py
-    import json
-    with open('use_case_analysis.json', 'w', encoding='utf-8') as f:
-        json.dump(analysis_summary, f, indent=2, default=str)
-    print("✓ Analysis results saved to: use_case_analysis.json")
-    
-    print(f"\n" + "=" * 60)
-    print("USE CASE GENERATION COMPLETE")
-    print("=" * 60)
-    print("Generated files:")
-    print("- use_case.xml: TAPAAL Timed-Arc Petri Net model")
-    print("- use_case.q: CTL diagnosability query")
-    print("- use_case_analysis.json: Detailed analysis results")
-    print(f"\nNext step: Run 'python use_case_report.py' to generate LaTeX report")
-    
-    # Provide verification command
-    print(f"\nTo verify with TAPAAL:")
-    print("docker run --rm -v $(pwd):/data tapaal/tapaal:3.9.2 verifyta -q /data/use_case.q /data/use_case.xml")
+    # Report lines are collected and written to stdout in one call, also
+    # when a step fails partway through
+    out = []
+    try:
+        out.append("=" * 60)
+        out.append("E-COMMERCE PLATFORM INSIDER THREAT USE CASE")
+        out.append("=" * 60)
+        
+        # Scenario description
+        out.append(ATTACK_SCENARIO_DESCRIPTION)
+        
+        # Create the e-commerce attack tree
+        out.append("Generating e-commerce attack tree...")
+        tree, node_attrs = ecommerce_tree()
+        
+        # Validate tree structure
+        issues = validate_tree_structure(tree, node_attrs)
+        if issues:
+            out.append(f"Warning: Tree structure issues found: {issues}")
+        else:
+            out.append("✓ Tree structure validation passed")
+        
+        # Get tree statistics
+        stats = get_tree_statistics(tree, node_attrs)
+        out.append(f"\nTree Statistics:")
+        out.append(f"- Total nodes: {stats['total_nodes']}")
+        out.append(f"- Leaf nodes: {stats['leaf_nodes']}")
+        out.append(f"- Internal nodes: {stats['internal_nodes']}")
+        out.append(f"- Tree depth: {stats['max_depth']}")
+        out.append(f"- Gate distribution: {stats['gate_counts']}")
+        out.append(f"- Total attack cost: {stats['total_cost']}")
+        out.append(f"- Average time span: {stats['avg_time_span']:.1f} hours")
+        
+        # Analyze attack paths
+        out.append(f"\nAnalyzing attack paths...")
+        path_analysis = analyze_attack_paths(tree, node_attrs)
+        out.append(f"- Total possible attack paths: {path_analysis['total_paths']}")
+        out.append(f"- Unique leaf attack vectors: {path_analysis['unique_leaves']}")
+        
+        # Demonstrate diagnosability with auth service observation
+        out.append(f"\nDiagnosability Analysis:")
+        diag_analysis = demonstrate_diagnosability_with_auth_service(tree, node_attrs, path_analysis)
+        out.append(f"- Observable node: {diag_analysis['observable_node']}")
+        out.append(f"- Paths involving auth service: {diag_analysis['paths_with_observation']}")
+        out.append(f"- Paths not involving auth service: {diag_analysis['paths_without_observation']}")
+        out.append(f"- Unique diagnosis possible: {diag_analysis['unique_diagnosis_possible']}")
+        
+        if diag_analysis['diagnosed_path']:
+            diagnosed = diag_analysis['diagnosed_path']
+            out.append(f"\nDiagnosed Attack Path:")
+            out.append(f"- Path: {' → '.join(diagnosed['path'])}")
+            out.append(f"- Primary attack vector: {diagnosed['leaf_node']}")
+            out.append(f"- Total cost: {diagnosed['total_cost']} units")
+            out.append(f"- Maximum time: {diagnosed['total_time']} hours")
+        
+        # Generate TAPAAL XML model
+        out.append(f"\nGenerating TAPAAL model...")
+        xml_content = enhanced_tapaal_xml(tree, node_attrs, "ecommerce")
+        
+        with open('use_case.xml', 'wb') as f:
+            f.write(xml_content)
+        out.append("✓ TAPAAL model saved to: use_case.xml")
+        
+        # Generate enhanced CTL query
+        out.append(f"Generating CTL diagnosability query...")
+        observable_nodes = {AUTH_SERVICE_EXPLOIT}  # Key observation point
+        query_content = generate_enhanced_ctl_query(tree, AUTH_SERVICE_EXPLOIT)
+        
+        with open('use_case.q', 'wb') as f:
+            f.write(query_content.encode('utf-8'))
+        out.append("✓ CTL query saved to: use_case.q")
+        
+        # Generate detailed analysis for the report
+        analysis_summary = {
+            'scenario': 'E-commerce Platform Insider Threat',
+            'tree_stats': stats,
+            'path_analysis': path_analysis,
+            'diagnosability': diag_analysis,
+            'observable_strategy': 'Authentication service monitoring',
+            'key_finding': 'Auth service compromise enables unique attack path diagnosis'
+        }
+        
+        # Save analysis results for use_case_report.py
+        import json
+        with open('use_case_analysis.json', 'wb') as f:
+            f.write(json.dumps(analysis_summary, indent=2).encode('utf-8'))
+        out.append("✓ Analysis results saved to: use_case_analysis.json")
+        
+        out.append(f"\n" + "=" * 60)
+        out.append("USE CASE GENERATION COMPLETE")
+        out.append("=" * 60)
+        out.append("Generated files:")
+        out.append("- use_case.xml: TAPAAL Timed-Arc Petri Net model")
+        out.append("- use_case.q: CTL diagnosability query")
+        out.append("- use_case_analysis.json: Detailed analysis results")
+        out.append(f"\nNext step: Run 'python use_case_report.py' to generate LaTeX report")
+        
+        # Provide verification command
+        out.append(f"\nTo verify with TAPAAL:")
+        out.append("docker run --rm -v $(pwd):/data tapaal/tapaal:3.9.2 verifyta -q /data/use_case.q /data/use_case.xml")
+    finally:
+        sys.stdout.write("\n".join(out) + "\n")
 
 
 if __name__ == "__main__":
@@ -10,10 +10,231 @@ Output:
 - use_case_table.tex: LaTeX table ready for inclusion in papers
 """
 
+import io
 import json
+import string
 import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional, TextIO, Tuple
+
+try:
+    import orjson  # Optional: faster JSON parsing
+except ImportError:
+    orjson = None
+
+
+# Node information for the attack tree structure table (this would ideally
+# come from the analysis)
+_NODES_INFO = (
+    ("cc\\_db\\_exfiltrated", "Root", "[0,72]", "2h", "5", "Credit card DB exfiltration"),
+    ("database\\_access", "AND", "[6,60]", "2h", "3", "Access to CC database"),
+    ("data\\_extraction", "AND", "[12,72]", "4h", "4", "Data extraction capability"),
+    ("internal\\_access", "OR", "[0,48]", "1h", "2", "Initial internal access"),
+    ("privilege\\_escalation", "OR", "[8,48]", "3h", "6", "Escalate system privileges"),
+    ("spear\\_phish\\_dev", "Leaf", "[0,24]", "4h", "8", "Spear phish developers"),
+    ("auth\\_service\\_exploit", "Leaf", "[0,12]", "2h", "12", "\\textbf{Exploit auth service}"),
+    ("network\\_lateral", "Leaf", "[6,36]", "6h", "10", "Network lateral movement"),
+    ("steal\\_db\\_credentials", "Leaf", "[8,48]", "3h", "7", "Steal database credentials"),
+    ("establish\\_exfil\\_channel", "Leaf", "[12,60]", "5h", "9", "Setup exfiltration channel"),
+)
+
+
+# Step descriptions for nodes of the diagnosed path
+_STEP_DESCRIPTIONS = {
+    "cc_db_exfiltrated": "Complete credit card database exfiltration",
+    "database_access": "Gain access to credit card database",
+    "data_extraction": "Establish data extraction capability",
+    "internal_access": "Achieve initial internal system access",
+    "privilege_escalation": "Escalate privileges for database access",
+    "auth_service_exploit": "\\textbf{Exploit authentication service vulnerability}",
+    "network_lateral_movement": "Perform lateral network movement",
+    "steal_db_credentials": "Steal database access credentials",
+    "establish_exfil_channel": "Establish covert data exfiltration channel",
+    "spear_phish_dev": "Execute spear phishing against developers"
+}
+
+# Metric name and interpretation of each diagnosability table row; only the
+# value column depends on the analysis
+_DIAG_ROW_META = (
+    ("Total attack paths", "Complete attack space size"),
+    ("Paths with auth exploit", "Paths involving observed node"),
+    ("Paths without auth exploit", "Paths not involving observed node"),
+    ("Observation coverage", "Fraction of attacks observable"),
+    ("Unique diagnosis possible", "Can uniquely identify attack path"),
+    ("Diagnosability result", "System satisfies Definition 10"),
+)
+
+# Underscore escaping for node IDs: precomputed for the known nodes, and a
+# translation table for anything else
+_LATEX_UNDERSCORE = str.maketrans({'_': '\\_'})
+_UNDERSCORE_TO_SPACE = str.maketrans('_', ' ')
+_NODE_LATEX = {node: node.translate(_LATEX_UNDERSCORE) for node in _STEP_DESCRIPTIONS}
+
+
+# Fixed preamble and closing lines of each table; rows are joined in between
+_ATTACK_TREE_HEADER = (
+    "% Attack Tree Structure Table\n"
+    "\\begin{table}[htbp]\n"
+    "\\centering\n"
+    "\\caption{E-commerce Platform Attack Tree Structure}\n"
+    "\\label{tab:ecommerce-attack-tree}\n"
+    "\\begin{tabular}{|l|c|c|c|c|l|}\n"
+    "\\hline\n"
+    "\\textbf{Node} & \\textbf{Type} & \\textbf{Time Window} & \\textbf{Duration} & \\textbf{Cost} & \\textbf{Description} \\\\\n"
+    "\\hline\n"
+)
+_ATTACK_TREE_FOOTER = "\n\\end{tabular}\n\\end{table}"
+
+_DIAG_HEADER = (
+    "% Diagnosability Analysis Results Table\n"
+    "\\begin{table}[htbp]\n"
+    "\\centering\n"
+    "\\caption{Diagnosability Analysis: Auth Service Observation}\n"
+    "\\label{tab:diagnosability-analysis}\n"
+    "\\begin{tabular}{|l|c|l|}\n"
+    "\\hline\n"
+    "\\textbf{Analysis Metric} & \\textbf{Value} & \\textbf{Interpretation} \\\\\n"
+    "\\hline\n"
+)
+_DIAG_FOOTER = "\n\\end{tabular}\n\\end{table}"
+
+_PATH_HEADER = (
+    "% Uniquely Diagnosed Attack Path Table\n"
+    "\\begin{table}[htbp]\n"
+    "\\centering\n"
+    "\\caption{Uniquely Diagnosed Attack Path After Auth Service Observation}\n"
+    "\\label{tab:diagnosed-attack-path}\n"
+    "\\begin{tabular}{|c|l|l|}\n"
+    "\\hline\n"
+    "\\textbf{Step} & \\textbf{Attack Node} & \\textbf{Description} \\\\\n"
+    "\\hline\n"
+)
+# Closes the path table with the attack summary row
+_PATH_FOOTER = (
+    "\n\\hline\n"
+    "\\multicolumn{{2}}{{|c|}}{{\\textbf{{Attack Summary}}}} & Cost: {total_cost} units, Time: {total_time}h \\\\\n"
+    "\\hline\n"
+    "\\end{{tabular}}\n"
+    "\\end{{table}}"
+)
+
+
+# Literal sections of the complete report; the generated tables go in between.
+# _REPORT_PREAMBLE is a str.format template (scenario_name, key_finding).
+_REPORT_PREAMBLE = """% E-commerce Platform Diagnosability Analysis Report
+% Generated automatically by use_case_report.py
+
+\\documentclass[11pt]{{article}}
+\\usepackage[utf8]{{inputenc}}
+\\usepackage{{booktabs}}
+\\usepackage{{array}}
+\\usepackage{{longtable}}
+\\usepackage{{geometry}}
+\\geometry{{margin=1in}}
+
+\\title{{Diagnosability Analysis: {scenario_name}}}
+\\author{{Attack Tree Research Team}}
+\\date{{\\today}}
+
+\\begin{{document}}
+
+\\maketitle
+
+\\section{{Executive Summary}}
+
+This report presents a detailed diagnosability analysis of a realistic insider threat scenario 
+targeting a cloud-hosted e-commerce platform. The analysis demonstrates that observing the 
+compromise of the authentication service enables unique diagnosis of the complete attack path, 
+satisfying the weak diagnosability property as defined in our theoretical framework.
+
+\\textbf{{Key Finding:}} {key_finding}
+
+\\section{{Attack Tree Structure}}
+
+"""
+
+_REPORT_DIAGNOSABILITY_SECTION = """
+
+The attack tree models a sophisticated insider threat scenario with 9 nodes representing 
+a multi-stage attack progression. The tree incorporates realistic time constraints based 
+on MITRE ATT\\&CK techniques and includes both technical and social attack vectors.
+
+\\section{Diagnosability Analysis Results}
+
+"""
+
+_REPORT_PATH_SECTION = """
+
+The analysis confirms that the authentication service serves as a critical observation point. 
+When this service is compromised, it provides sufficient information to uniquely identify 
+the attacker's complete strategy and progression.
+
+\\section{Diagnosed Attack Path}
+
+"""
+
+_REPORT_CLOSING = """
+
+The uniquely diagnosed attack path shows a sophisticated multi-stage progression typical 
+of advanced persistent threat (APT) scenarios. The authentication service compromise occurs 
+early in the attack chain and constrains the subsequent attack options to a single consistent sequence.
+
+\\section{Security Implications}
+
+\\subsection{For Defenders}
+\\begin{itemize}
+    \\item Deploy comprehensive monitoring on authentication services
+    \\item Implement real-time alerts for authentication service anomalies  
+    \\item Use attack path diagnosis to predict and prevent subsequent attack stages
+    \\item Focus incident response resources on the diagnosed attack progression
+\\end{itemize}
+
+\\subsection{For System Designers}
+\\begin{itemize}
+    \\item Design systems with diagnosability requirements in mind
+    \\item Place critical services in observable network segments
+    \\item Implement comprehensive logging for authentication and authorization events
+    \\item Consider attack tree analysis during security architecture design
+\\end{itemize}
+
+\\section{Conclusion}
+
+This use case demonstrates the practical applicability of attack tree diagnosability analysis 
+for real-world security scenarios. The ability to uniquely diagnose attack paths from partial 
+observations provides significant advantages for both incident response and proactive defense.
+
+The results confirm that strategic placement of monitoring capabilities, particularly on 
+critical services like authentication systems, can provide sufficient observability for 
+effective attack diagnosis without requiring comprehensive system-wide monitoring.
+
+\\end{document}
+"""
+
+
+# Plain-text summary printed and saved by main
+_SUMMARY_TPL = string.Template("""
+E-COMMERCE DIAGNOSABILITY ANALYSIS SUMMARY
+=========================================
+
+Scenario: $scenario
+Observable Strategy: $observable_strategy
+
+Tree Statistics:
+- Total nodes: $total_nodes
+- Leaf nodes: $leaf_nodes
+- Attack paths: $total_paths
+
+Diagnosability Results:
+- Paths with auth observation: $paths_with_observation
+- Unique diagnosis possible: $unique_diagnosis_possible
+
+Key Finding: $key_finding
+
+Generated Files:
+- use_case_table.tex: LaTeX table for paper inclusion
+- use_case_report.tex: Complete analysis report
+""")
 
 
 def load_use_case_analysis() -> Dict[str, Any]:
@@ -30,8 +251,8 @@ def load_use_case_analysis() -> Dict[str, Any]:
         print("Please run 'python use_case.py' first to generate analysis")
         sys.exit(1)
     
-    with open(analysis_file, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    data = Path(analysis_file).read_bytes()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
 
 
 def generate_attack_tree_table(analysis: Dict[str, Any]) -> str:
@@ -44,44 +265,19 @@ def generate_attack_tree_table(analysis: Dict[str, Any]) -> str:
     Returns:
         LaTeX table string
     """
-    latex_lines = [
-        "% Attack Tree Structure Table",
-        "\\begin{table}[htbp]",
-        "\\centering",
-        "\\caption{E-commerce Platform Attack Tree Structure}",
-        "\\label{tab:ecommerce-attack-tree}",
-        "\\begin{tabular}{|l|c|c|c|c|l|}",
-        "\\hline",
-        "\\textbf{Node} & \\textbf{Type} & \\textbf{Time Window} & \\textbf{Duration} & \\textbf{Cost} & \\textbf{Description} \\\\",
-        "\\hline",
-    ]
-    
-    # Define node information (this would ideally come from the analysis)
-    nodes_info = [
-        ("cc\\_db\\_exfiltrated", "Root", "[0,72]", "2h", "5", "Credit card DB exfiltration"),
-        ("database\\_access", "AND", "[6,60]", "2h", "3", "Access to CC database"),
-        ("data\\_extraction", "AND", "[12,72]", "4h", "4", "Data extraction capability"),
-        ("internal\\_access", "OR", "[0,48]", "1h", "2", "Initial internal access"),
-        ("privilege\\_escalation", "OR", "[8,48]", "3h", "6", "Escalate system privileges"),
-        ("spear\\_phish\\_dev", "Leaf", "[0,24]", "4h", "8", "Spear phish developers"),
-        ("auth\\_service\\_exploit", "Leaf", "[0,12]", "2h", "12", "\\textbf{Exploit auth service}"),
-        ("network\\_lateral", "Leaf", "[6,36]", "6h", "10", "Network lateral movement"),
-        ("steal\\_db\\_credentials", "Leaf", "[8,48]", "3h", "7", "Steal database credentials"),
-        ("establish\\_exfil\\_channel", "Leaf", "[12,60]", "5h", "9", "Setup exfiltration channel"),
-    ]
-    
-    for node_id, node_type, time_window, duration, cost, description in nodes_info:
-        latex_lines.append(
-            f"{node_id} & {node_type} & {time_window} & {duration} & {cost} & {description} \\\\"
-        )
-        latex_lines.append("\\hline")
-    
-    latex_lines.extend([
-        "\\end{tabular}",
-        "\\end{table}",
-    ])
+    return _attack_tree_table()
+
+
+@lru_cache(maxsize=1)
+def _attack_tree_table() -> str:
+    """Build the attack tree table; its rows are fixed, so it is built once."""
+    # One row per node, each followed by a rule
+    body = "\n".join(
+        f"{node_id} & {node_type} & {time_window} & {duration} & {cost} & {description} \\\\\n\\hline"
+        for node_id, node_type, time_window, duration, cost, description in _NODES_INFO
+    )
     
-    return "\n".join(latex_lines)
+    return _ATTACK_TREE_HEADER + body + _ATTACK_TREE_FOOTER
 
 
 def generate_diagnosability_analysis_table(analysis: Dict[str, Any]) -> str:
@@ -94,46 +290,50 @@ def generate_diagnosability_analysis_table(analysis: Dict[str, Any]) -> str:
     Returns:
         LaTeX table string
     """
-    diag_results = analysis.get('diagnosability', {})
-    path_analysis = analysis.get('path_analysis', {})
-    
-    latex_lines = [
-        "% Diagnosability Analysis Results Table",
-        "\\begin{table}[htbp]",
-        "\\centering",
-        "\\caption{Diagnosability Analysis: Auth Service Observation}",
-        "\\label{tab:diagnosability-analysis}",
-        "\\begin{tabular}{|l|c|l|}",
-        "\\hline",
-        "\\textbf{Analysis Metric} & \\textbf{Value} & \\textbf{Interpretation} \\\\",
-        "\\hline",
-    ]
+    diag_results = analysis.get('diagnosability') or {}
     
     # Extract key metrics
-    total_paths = diag_results.get('total_attack_paths', 0)
-    paths_with_auth = diag_results.get('paths_with_observation', 0)
-    paths_without_auth = diag_results.get('paths_without_observation', 0)
-    unique_diagnosis = diag_results.get('unique_diagnosis_possible', False)
+    return _diagnosability_table(
+        diag_results.get('total_attack_paths', 0),
+        diag_results.get('paths_with_observation', 0),
+        diag_results.get('paths_without_observation', 0),
+        diag_results.get('unique_diagnosis_possible', False),
+    )
+
+
+@lru_cache(maxsize=None)
+def _diagnosability_table(total_paths: int, paths_with_auth: int, paths_without_auth: int,
+                          unique_diagnosis: bool) -> str:
+    """
+    Build the diagnosability table from its metrics, memoized on their values.
     
-    rows = [
-        ("Total attack paths", str(total_paths), "Complete attack space size"),
-        ("Paths with auth exploit", str(paths_with_auth), "Paths involving observed node"),
-        ("Paths without auth exploit", str(paths_without_auth), "Paths not involving observed node"),
-        ("Observation coverage", f"{(paths_with_auth/total_paths)*100:.1f}\\%" if total_paths > 0 else "0\\%", "Fraction of attacks observable"),
-        ("Unique diagnosis possible", "Yes" if unique_diagnosis else "No", "Can uniquely identify attack path"),
-        ("Diagnosability result", "\\textbf{Weakly Diagnosable}", "System satisfies Definition 10"),
-    ]
+    Args:
+        total_paths: Total number of attack paths
+        paths_with_auth: Number of paths involving the observed node
+        paths_without_auth: Number of paths not involving the observed node
+        unique_diagnosis: Whether the attack path can be uniquely identified
     
-    for metric, value, interpretation in rows:
-        latex_lines.append(f"{metric} & {value} & {interpretation} \\\\")
-        latex_lines.append("\\hline")
+    Returns:
+        LaTeX table string
+    """
+    coverage_str = f"{(paths_with_auth/total_paths)*100:.1f}\\%" if total_paths > 0 else "0\\%"
+    
+    # Values in _DIAG_ROW_META order
+    values = (
+        str(total_paths),
+        str(paths_with_auth),
+        str(paths_without_auth),
+        coverage_str,
+        "Yes" if unique_diagnosis else "No",
+        "\\textbf{Weakly Diagnosable}",
+    )
     
-    latex_lines.extend([
-        "\\end{tabular}",
-        "\\end{table}",
-    ])
+    latex_lines = [
+        f"{metric} & {value} & {interpretation} \\\\\n\\hline"
+        for (metric, interpretation), value in zip(_DIAG_ROW_META, values)
+    ]
     
-    return "\n".join(latex_lines)
+    return _DIAG_HEADER + "\n".join(latex_lines) + _DIAG_FOOTER
 
 
 def generate_diagnosed_attack_path_table(analysis: Dict[str, Any]) -> str:
@@ -146,59 +346,85 @@ def generate_diagnosed_attack_path_table(analysis: Dict[str, Any]) -> str:
     Returns:
         LaTeX table string
     """
-    diag_results = analysis.get('diagnosability', {})
+    diag_results = analysis.get('diagnosability') or {}
     diagnosed_path = diag_results.get('diagnosed_path', {})
     
     if not diagnosed_path:
         return "% No diagnosed path available\n"
     
+    return _diagnosed_attack_path_table(
+        tuple(diagnosed_path.get('path', [])),
+        diagnosed_path.get('total_cost', 0),
+        diagnosed_path.get('total_time', 0),
+    )
+
+
+@lru_cache(maxsize=None)
+def _diagnosed_attack_path_table(path_nodes: Tuple[str, ...], total_cost: int, total_time: int) -> str:
+    """
+    Build the diagnosed attack path table, memoized on the path and its totals.
+    
+    Args:
+        path_nodes: Node IDs of the diagnosed path in root-to-leaf order
+        total_cost: Total cost of the path
+        total_time: Maximum time of the path
+    
+    Returns:
+        LaTeX table string
+    """
     latex_lines = [
-        "% Uniquely Diagnosed Attack Path Table",
-        "\\begin{table}[htbp]",
-        "\\centering",
-        "\\caption{Uniquely Diagnosed Attack Path After Auth Service Observation}",
-        "\\label{tab:diagnosed-attack-path}",
-        "\\begin{tabular}{|c|l|l|}",
-        "\\hline",
-        "\\textbf{Step} & \\textbf{Attack Node} & \\textbf{Description} \\\\",
-        "\\hline",
+        f"{i} & {_NODE_LATEX.get(node) or node.translate(_LATEX_UNDERSCORE)} & "
+        f"{_STEP_DESCRIPTIONS.get(node) or 'Execute ' + node.translate(_UNDERSCORE_TO_SPACE)} \\\\\n\\hline"
+        for i, node in enumerate(path_nodes, 1)
     ]
     
-    # Define step descriptions for the diagnosed path
-    step_descriptions = {
-        "cc_db_exfiltrated": "Complete credit card database exfiltration",
-        "database_access": "Gain access to credit card database",
-        "data_extraction": "Establish data extraction capability",
-        "internal_access": "Achieve initial internal system access",
-        "privilege_escalation": "Escalate privileges for database access",
-        "auth_service_exploit": "\\textbf{Exploit authentication service vulnerability}",
-        "network_lateral_movement": "Perform lateral network movement",
-        "steal_db_credentials": "Steal database access credentials",
-        "establish_exfil_channel": "Establish covert data exfiltration channel",
-        "spear_phish_dev": "Execute spear phishing against developers"
-    }
+    # Add summary row
+    return _PATH_HEADER + "\n".join(latex_lines) + _PATH_FOOTER.format(
+        total_cost=total_cost, total_time=total_time)
+
+
+def generate_report_tables(analysis: Dict[str, Any]) -> Tuple[str, str, str]:
+    """
+    Generate the three tables embedded in the complete report.
     
-    path_nodes = diagnosed_path.get('path', [])
+    Args:
+        analysis: Analysis results dictionary
     
-    for i, node in enumerate(path_nodes, 1):
-        node_latex = node.replace('_', '\\_')
-        description = step_descriptions.get(node, f"Execute {node.replace('_', ' ')}")
-        latex_lines.append(f"{i} & {node_latex} & {description} \\\\")
-        latex_lines.append("\\hline")
+    Returns:
+        Tuple of (attack tree table, diagnosability table, diagnosed path table)
+    """
+    return (
+        generate_attack_tree_table(analysis),
+        generate_diagnosability_analysis_table(analysis),
+        generate_diagnosed_attack_path_table(analysis),
+    )
+
+
+def write_complete_latex_document(analysis: Dict[str, Any], fp: TextIO,
+                                  tables: Optional[Tuple[str, str, str]] = None) -> None:
+    """
+    Write the complete LaTeX document with all tables and analysis to a stream.
     
-    # Add summary row
-    total_cost = diagnosed_path.get('total_cost', 0)
-    total_time = diagnosed_path.get('total_time', 0)
+    Args:
+        analysis: Analysis results dictionary
+        fp: Text stream to write the document to
+        tables: Tables as returned by generate_report_tables, if already
+                generated; built from analysis otherwise
+    """
+    scenario_name = analysis.get('scenario', 'E-commerce Platform Insider Threat')
+    key_finding = analysis.get('key_finding', 'Auth service compromise enables unique attack path diagnosis')
     
-    latex_lines.extend([
-        "\\hline",
-        f"\\multicolumn{{2}}{{|c|}}{{\\textbf{{Attack Summary}}}} & Cost: {total_cost} units, Time: {total_time}h \\\\",
-        "\\hline",
-        "\\end{tabular}",
-        "\\end{table}",
-    ])
+    if tables is None:
+        tables = generate_report_tables(analysis)
+    attack_tree_table, diagnosability_table, path_table = tables
     
-    return "\n".join(latex_lines)
+    fp.write(_REPORT_PREAMBLE.format(scenario_name=scenario_name, key_finding=key_finding))
+    fp.write(attack_tree_table)
+    fp.write(_REPORT_DIAGNOSABILITY_SECTION)
+    fp.write(diagnosability_table)
+    fp.write(_REPORT_PATH_SECTION)
+    fp.write(path_table)
+    fp.write(_REPORT_CLOSING)
 
 
 def generate_complete_latex_document(analysis: Dict[str, Any]) -> str:
@@ -211,160 +437,71 @@ def generate_complete_latex_document(analysis: Dict[str, Any]) -> str:
     Returns:
         Complete LaTeX document string
     """
-    scenario_name = analysis.get('scenario', 'E-commerce Platform Insider Threat')
-    key_finding = analysis.get('key_finding', 'Auth service compromise enables unique attack path diagnosis')
-    
-    latex_document = f"""% E-commerce Platform Diagnosability Analysis Report
-% Generated automatically by use_case_report.py
-
-\\documentclass[11pt]{{article}}
-\\usepackage[utf8]{{inputenc}}
-\\usepackage{{booktabs}}
-\\usepackage{{array}}
-\\usepackage{{longtable}}
-\\usepackage{{geometry}}
-\\geometry{{margin=1in}}
-
-\\title{{Diagnosability Analysis: {scenario_name}}}
-\\author{{Attack Tree Research Team}}
-\\date{{\\today}}
-
-\\begin{{document}}
-
-\\maketitle
-
-\\section{{Executive Summary}}
-
-This report presents a detailed diagnosability analysis of a realistic insider threat scenario 
-targeting a cloud-hosted e-commerce platform. The analysis demonstrates that observing the 
-compromise of the authentication service enables unique diagnosis of the complete attack path, 
-satisfying the weak diagnosability property as defined in our theoretical framework.
-
-\\textbf{{Key Finding:}} {key_finding}
-
-\\section{{Attack Tree Structure}}
-
-{generate_attack_tree_table(analysis)}
-
-The attack tree models a sophisticated insider threat scenario with 9 nodes representing 
-a multi-stage attack progression. The tree incorporates realistic time constraints based 
-on MITRE ATT\\&CK techniques and includes both technical and social attack vectors.
-
-\\section{{Diagnosability Analysis Results}}
-
-{generate_diagnosability_analysis_table(analysis)}
-
-The analysis confirms that the authentication service serves as a critical observation point. 
-When this service is compromised, it provides sufficient information to uniquely identify 
-the attacker's complete strategy and progression.
-
-\\section{{Diagnosed Attack Path}}
-
-{generate_diagnosed_attack_path_table(analysis)}
-
-The uniquely diagnosed attack path shows a sophisticated multi-stage progression typical 
-of advanced persistent threat (APT) scenarios. The authentication service compromise occurs 
-early in the attack chain and constrains the subsequent attack options to a single consistent sequence.
-
-\\section{{Security Implications}}
-
-\\subsection{{For Defenders}}
-\\begin{{itemize}}
-    \\item Deploy comprehensive monitoring on authentication services
-    \\item Implement real-time alerts for authentication service anomalies  
-    \\item Use attack path diagnosis to predict and prevent subsequent attack stages
-    \\item Focus incident response resources on the diagnosed attack progression
-\\end{{itemize}}
-
-\\subsection{{For System Designers}}
-\\begin{{itemize}}
-    \\item Design systems with diagnosability requirements in mind
-    \\item Place critical services in observable network segments
-    \\item Implement comprehensive logging for authentication and authorization events
-    \\item Consider attack tree analysis during security architecture design
-\\end{{itemize}}
-
-\\section{{Conclusion}}
-
-This use case demonstrates the practical applicability of attack tree diagnosability analysis 
-for real-world security scenarios. The ability to uniquely diagnose attack paths from partial 
-observations provides significant advantages for both incident response and proactive defense.
-
-The results confirm that strategic placement of monitoring capabilities, particularly on 
-critical services like authentication systems, can provide sufficient observability for 
-effective attack diagnosis without requiring comprehensive system-wide monitoring.
-
-\\end{{document}}
-"""
-    
-    return latex_document
+    buf = io.StringIO()
+    write_complete_latex_document(analysis, buf)
+    return buf.getvalue()
 
 
 def main():
     """Main function to generate LaTeX report."""
+    # Written directly: the loader reports a missing analysis file on stdout
+    # and exits, and that message must follow this header
     print("Generating LaTeX diagnosability analysis report...")
     
     # Load analysis results
     analysis = load_use_case_analysis()
-    print("✓ Loaded use case analysis results")
-    
-    # Generate individual LaTeX table
-    print("Generating LaTeX table...")
-    table_latex = generate_diagnosed_attack_path_table(analysis)
-    
-    # Save table to file
-    with open('use_case_table.tex', 'w', encoding='utf-8') as f:
-        f.write(table_latex)
-    print("✓ LaTeX table saved to: use_case_table.tex")
-    
-    # Generate complete LaTeX document
-    print("Generating complete LaTeX report...")
-    document_latex = generate_complete_latex_document(analysis)
-    
-    # Save complete document
-    with open('use_case_report.tex', 'w', encoding='utf-8') as f:
-        f.write(document_latex)
-    print("✓ Complete LaTeX report saved to: use_case_report.tex")
-    
-    # Generate analysis summary
-    analysis_summary = f"""
-E-COMMERCE DIAGNOSABILITY ANALYSIS SUMMARY
-=========================================
-
-Scenario: {analysis.get('scenario', 'Unknown')}
-Observable Strategy: {analysis.get('observable_strategy', 'Unknown')}
-
-Tree Statistics:
-- Total nodes: {analysis.get('tree_stats', {}).get('total_nodes', 'Unknown')}
-- Leaf nodes: {analysis.get('tree_stats', {}).get('leaf_nodes', 'Unknown')}
-- Attack paths: {analysis.get('path_analysis', {}).get('total_paths', 'Unknown')}
-
-Diagnosability Results:
-- Paths with auth observation: {analysis.get('diagnosability', {}).get('paths_with_observation', 'Unknown')}
-- Unique diagnosis possible: {analysis.get('diagnosability', {}).get('unique_diagnosis_possible', 'Unknown')}
-
-Key Finding: {analysis.get('key_finding', 'Unknown')}
-
-Generated Files:
-- use_case_table.tex: LaTeX table for paper inclusion
-- use_case_report.tex: Complete analysis report
-"""
     
-    print(analysis_summary)
-    
-    # Save summary
-    with open('use_case_summary.txt', 'w', encoding='utf-8') as f:
-        f.write(analysis_summary)
-    
-    print("=" * 50)
-    print("LATEX REPORT GENERATION COMPLETE")
-    print("=" * 50)
-    print("Generated files:")
-    print("- use_case_table.tex: Table for inclusion in conference papers")
-    print("- use_case_report.tex: Complete standalone LaTeX report")
-    print("- use_case_summary.txt: Text summary of results")
-    print("\nTo compile LaTeX report:")
-    print("pdflatex use_case_report.tex")
+    # Remaining status lines are collected and written to stdout in one call,
+    # also when a later step fails
+    out = ["✓ Loaded use case analysis results"]
+    try:
+        # Generate the report tables once; the diagnosed path table is also
+        # saved on its own
+        out.append("Generating LaTeX table...")
+        tables = generate_report_tables(analysis)
+        table_latex = tables[2]
+        
+        # Save table to file
+        Path('use_case_table.tex').write_bytes(table_latex.encode('utf-8'))
+        out.append("✓ LaTeX table saved to: use_case_table.tex")
+        
+        # Generate complete LaTeX document straight into the output file
+        out.append("Generating complete LaTeX report...")
+        with open('use_case_report.tex', 'w', encoding='utf-8') as f:
+            write_complete_latex_document(analysis, f, tables)
+        out.append("✓ Complete LaTeX report saved to: use_case_report.tex")
+        
+        # Generate analysis summary
+        tree_stats = analysis.get('tree_stats') or {}
+        path_analysis = analysis.get('path_analysis') or {}
+        diag_results = analysis.get('diagnosability') or {}
+        analysis_summary = _SUMMARY_TPL.substitute(
+            scenario=analysis.get('scenario', 'Unknown'),
+            observable_strategy=analysis.get('observable_strategy', 'Unknown'),
+            total_nodes=tree_stats.get('total_nodes', 'Unknown'),
+            leaf_nodes=tree_stats.get('leaf_nodes', 'Unknown'),
+            total_paths=path_analysis.get('total_paths', 'Unknown'),
+            paths_with_observation=diag_results.get('paths_with_observation', 'Unknown'),
+            unique_diagnosis_possible=diag_results.get('unique_diagnosis_possible', 'Unknown'),
+            key_finding=analysis.get('key_finding', 'Unknown'),
+        )
+        
+        out.append(analysis_summary)
+        
+        # Save summary
+        Path('use_case_summary.txt').write_bytes(analysis_summary.encode('utf-8'))
+        
+        out.append("=" * 50)
+        out.append("LATEX REPORT GENERATION COMPLETE")
+        out.append("=" * 50)
+        out.append("Generated files:")
+        out.append("- use_case_table.tex: Table for inclusion in conference papers")
+        out.append("- use_case_report.tex: Complete standalone LaTeX report")
+        out.append("- use_case_summary.txt: Text summary of results")
+        out.append("\nTo compile LaTeX report:")
+        out.append("pdflatex use_case_report.tex")
+    finally:
+        sys.stdout.write("\n".join(out) + "\n")
 
 
 if __name__ == "__main__":